@@ -1,18 +1,66 @@
-import pandas as pd
+import hashlib
+import json
+import os
+import sys
 
-file_path = 'personal_finance_employees_V1.csv'
-finance_data = pd.read_csv(file_path)
+from imputation import Imputer
+from ingestion import read_finance_csv
 
-# Calculate the mean of the "Water Bill (£)" and "Monthly Outing (£)"
-water_bill_avg = finance_data['Water Bill (£)'].mean()
-monthly_bill_avg = finance_data['Monthly Outing (£)'].mean()
+# Usage: python FIllColumns.py [new_batch.csv]
+# Each run fills one batch of rows and appends it to the output. Fill values come from running
+# statistics saved next to the output, so earlier batches are never re-read.
+file_path = sys.argv[1] if len(sys.argv) > 1 else 'personal_finance_employees_V1.csv'
+output_file_path = 'personal_finance_employees_filled.csv'
+# Fill statistics plus the digests of the batches already appended, in one file that is replaced
+# atomically, so the statistics and the list of appended batches can never disagree
+state_path = 'personal_finance_employees_fill_state.json'
 
-# Fill NaN values with the calculated average
-finance_data['Water Bill (£)'] = finance_data['Water Bill (£)'].fillna(water_bill_avg)
-finance_data['Sky Sports (£)'] = finance_data['Sky Sports (£)'].fillna(0)
-finance_data['Other Expenses (£)'] = finance_data['Other Expenses (£)'].fillna(0)
-finance_data['Savings for Property (£)'] = finance_data['Savings for Property (£)'].fillna(0)
-finance_data['Monthly Outing (£)'] = finance_data['Monthly Outing (£)'].fillna(monthly_bill_avg)
 
-output_file_path = 'personal_finance_employees_filled.csv'
-finance_data.to_csv(output_file_path, index=False)
+def save_state(state):
+    tmp_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, state_path)
+
+
+batch_digest = hashlib.sha256()
+with open(file_path, 'rb') as f:
+    for block in iter(lambda: f.read(1 << 20), b''):
+        batch_digest.update(block)
+batch_digest = batch_digest.hexdigest()
+
+state = {'imputer': None, 'batches': [], 'pending': None}
+if os.path.exists(state_path):
+    with open(state_path) as f:
+        state = json.load(f)
+if state['pending'] is not None:
+    # An earlier run stopped between appending and saving its statistics: drop its partial rows.
+    # The saved statistics are still those from before that batch.
+    output_bytes = state['pending']['output_bytes']
+    if os.path.exists(output_file_path):
+        os.truncate(output_file_path, output_bytes)
+    print(f"Rolled back an unfinished run of batch {state['pending']['batch'][:12]}")
+    state['pending'] = None
+if batch_digest in state['batches']:
+    sys.exit(f"{file_path} has already been filled into {output_file_path}; nothing to do.")
+
+# "Water Bill (£)" and "Monthly Outing (£)" are filled with their running mean,
+# "Sky Sports (£)", "Other Expenses (£)" and "Savings for Property (£)" with 0
+imputer = Imputer.from_dict(state['imputer']) if state['imputer'] else Imputer()
+finance_data, report = read_finance_csv(file_path, imputer=imputer)
+print(report.summary())
+
+# Mark the batch as in progress before touching the output, so a crash can be rolled back
+output_bytes = os.path.getsize(output_file_path) if os.path.exists(output_file_path) else 0
+save_state({**state, 'pending': {'batch': batch_digest, 'output_bytes': output_bytes}})
+
+# The filled rows depend on earlier batches' statistics, so they only go to the output CSV and
+# never into the content-addressed dataset store
+with open(output_file_path, 'a', newline='') as f:
+    finance_data.to_csv(f, header=output_bytes == 0, index=False)
+    f.flush()
+    os.fsync(f.fileno())
+
+save_state({'imputer': imputer.to_dict(), 'batches': state['batches'] + [batch_digest], 'pending': None})
@@ -1,30 +1,33 @@
 import streamlit as st
-import seaborn as sns
-import matplotlib.pyplot as plt
+import plotly.express as px
 
+from correlation import CORRELATION_COLUMNS, METHODS, cached_correlation
+from data_access import dataset_key
+from profiling import profiled_page
+
+@profiled_page("Correlation Analysis")
 def correlation_analysis():
     st.title("Correlation Analysis")
 
     data = st.session_state['uploaded_data']
 
     # Select expense categories for analysis
-    expense_columns = ['Monthly Income (£)', 'Water Bill (£)', 'Electricity Bill (£)', 'Gas Bill (£)', 'Groceries (£)', 'Transportation (£)',
-                       'Sky Sports (£)', 'Other Expenses (£)', 'Savings for Property (£)', 'Monthly Outing (£)', 'Netflix (£)', 'Amazon Prime (£)']
+    expense_columns = [column for column in CORRELATION_COLUMNS if column in data.columns]
     selected_categories = st.multiselect("Select categories for correlation analysis:", expense_columns, default=expense_columns[:5])
+    method = st.radio("Correlation method:", METHODS, format_func=str.title, horizontal=True)
 
     if len(selected_categories) < 2:
         st.warning("Please select at least two categories for correlation analysis.")
         return
 
-    # Calculate correlation matrix
-    correlation_matrix = data[selected_categories].corr()
+    # The full matrix is computed once per dataset and method; a selection is a slice of it
+    correlation_matrix = cached_correlation(data, dataset_key(st.session_state), method)
+    correlation_matrix = correlation_matrix.loc[selected_categories, selected_categories]
 
     # Create heatmap
-    fig, ax = plt.subplots(figsize=(10, 8))
-    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', ax=ax)
-    plt.title("Correlation Heatmap")
-    st.pyplot(fig)
+    fig = px.imshow(correlation_matrix, text_auto='.2f', color_continuous_scale='RdBu_r', zmin=-1, zmax=1,
+                    aspect='auto', title="Correlation Heatmap")
+    st.plotly_chart(fig)
 
 if __name__ == "__main__":
     correlation_analysis()
-
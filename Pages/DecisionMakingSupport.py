@@ -1,6 +1,12 @@
 import streamlit as st
 import pandas as pd
 
+from data_access import dataset_key, get_employee_index
+from profiling import profiled_page
+from results_store import load_results
+from savings_simulator import simulate, to_frame
+
+@profiled_page("Decision-Making Support")
 def decision_making_support():
     st.title("Decision-Making Support")
 
@@ -15,9 +21,9 @@ def decision_making_support():
     income = 'Monthly Income (£)'
 
     if 'Employee' in data.columns:
-        unique_employees = data['Employee'].unique()
-        selected_employee = st.selectbox("Select Employee for Prediction:", unique_employees)
-        employee_data = data[data['Employee'] == selected_employee]
+        employee_index = get_employee_index(st.session_state)
+        selected_employee = st.selectbox("Select Employee for Prediction:", employee_index.employees)
+        employee_data = employee_index.rows(selected_employee)
 
         if employee_data.empty:
             st.error("No data found for the selected employee.")
@@ -83,5 +89,28 @@ def decision_making_support():
     except Exception as e:
         st.error(f"Real-time updates error: {e}")
 
+    # Same goal check for the whole workforce in one vectorized pass
+    st.subheader("Workforce Savings Scenario")
+    goals_text = st.text_input("Savings targets to test for every employee (£, comma-separated):",
+                               value=f"{savings_goal:.0f}")
+    try:
+        goals = [float(goal) for goal in goals_text.split(',') if goal.strip()]
+    except ValueError:
+        st.error("Savings targets must be numbers separated by commas.")
+        return
+    if not goals:
+        return
+
+    # analytics.py stores the one row per employee the simulation needs
+    stage_results = load_results(dataset_key(st.session_state), 'decisions')
+    inputs = stage_results['employee_inputs'] if stage_results is not None else data
+    scenario = to_frame(simulate(inputs, goals))
+    status_counts = scenario.pivot_table(index='Savings Goal (£)', columns='Goal Status', values='Employee',
+                                         aggfunc='count', fill_value=0)
+    st.write("Employees meeting each target:", status_counts)
+    st.dataframe(scenario.sort_values(['Savings Goal (£)', 'Shortfall (£)'], ascending=[True, False]))
+    st.download_button("Download scenario results (CSV)", scenario.to_csv(index=False),
+                       file_name="savings_scenarios.csv", mime="text/csv")
+
 if __name__ == "__main__":
     decision_making_support()
@@ -1,51 +1,61 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
 
+import charts
+from clustering import CLUSTER_FEATURES, LARGE_DATA_ROWS, SWEEP_KS, cached_clusters, cached_sweep
+from data_access import dataset_key
+from profiling import profiled_page
+
+@profiled_page("Expense Clustering")
 def expense_clustering():
     st.title("Expense Clustering")
     data = st.session_state['uploaded_data']
 
     # Select features for clustering
-    expense_columns = ['Electricity Bill (£)', 'Gas Bill (£)', 'Groceries (£)',
-                       'Transportation (£)', 'Water Bill (£)', 'Sky Sports (£)', 'Other Expenses (£)',
-                       'Monthly Outing (£)']
-
-    # Normalize data
-    scaler = StandardScaler()
-    normalized_data = scaler.fit_transform(data[expense_columns])
-
-    # K-Means clustering
-    n_clusters = st.sidebar.slider("Number of Clusters", 2, 10, 3)
-    model = KMeans(n_clusters=n_clusters, random_state=42)
-
-    labels = model.fit_predict(normalized_data)
-
-    pca = PCA(n_components=2)
-    pca_result = pca.fit_transform(normalized_data)
+    expense_columns = CLUSTER_FEATURES
+
+    large_mode = st.sidebar.checkbox("Large dataset mode (MiniBatchKMeans + IncrementalPCA)",
+                                     value=len(data) > LARGE_DATA_ROWS)
+    run_sweep = st.sidebar.checkbox(f"Score k = {SWEEP_KS.start}..{SWEEP_KS.stop - 1}", value=True)
+
+    # Fit every k once and suggest one, so the slider doesn't have to be guessed
+    default_k = 3
+    if run_sweep:
+        sweep = cached_sweep(data, dataset_key(st.session_state), large=large_mode)
+        default_k = sweep.recommended_k
+        st.subheader("Choosing the Number of Clusters")
+        st.info(f"Recommended number of clusters: {sweep.recommended_k} (highest silhouette score); "
+                f"the inertia elbow is at {sweep.elbow_k}.")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.plotly_chart(px.line(sweep.scores, x='k', y='Inertia', markers=True, title="Elbow (Inertia)"))
+        with col2:
+            st.plotly_chart(px.line(sweep.scores, x='k', y='Silhouette', markers=True, title="Silhouette Score"))
+
+    # K-Means clustering; fits are cached per number of clusters
+    n_clusters = st.sidebar.slider("Number of Clusters", 2, 10, default_k)
+    result = cached_clusters(data, dataset_key(st.session_state), n_clusters, large=large_mode)
+    labels = result.labels
+    pca_result = result.embedding
 
     # Create DataFrame for plotting
     plot_df = pd.DataFrame({
         'Expense Dimension 1': pca_result[:, 0],
         'Expense Dimension 2': pca_result[:, 1],
         'Cluster': labels,
-        'Employee': data['Employee'],
-        'Monthly Income (£)': data['Monthly Income (£)']
+        'Employee': data['Employee'].to_numpy(),
+        'Monthly Income (£)': data['Monthly Income (£)'].to_numpy()
     })
 
-    fig = px.scatter(plot_df, x='Expense Dimension 1', y='Expense Dimension 2',
-                     color='Cluster', hover_data=['Employee', 'Monthly Income (£)'])
-    st.plotly_chart(fig)
+    fig, note = charts.scatter(plot_df, x='Expense Dimension 1', y='Expense Dimension 2',
+                               color='Cluster', hover_data=['Employee', 'Monthly Income (£)'])
+    charts.show(fig, note)
 
     st.subheader("Cluster Descriptions")
-    for cluster in np.unique(labels):
-        cluster_data = data[labels == cluster]
+    for cluster, profile in result.profiles[expense_columns].iterrows():
         st.write(f"Cluster {cluster}:")
-        st.write(cluster_data[expense_columns].mean().to_dict())
+        st.write(profile.to_dict())
 
 if __name__ == "__main__":
     expense_clustering()
\ No newline at end of file
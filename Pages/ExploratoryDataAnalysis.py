@@ -2,8 +2,14 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 import numpy as np
-from sklearn.linear_model import LinearRegression
 
+import charts
+from data_access import dataset_key, get_employee_index
+from profiling import profiled_page
+from results_store import load_results
+from trend import cached_trends, fit_line, forecast
+
+@profiled_page("Exploratory Data Analysis")
 def exploratory_data_analysis():
     st.title("Exploratory Data Analysis (EDA)")
     st.sidebar.title("EDA Navigation")
@@ -15,8 +21,10 @@ def exploratory_data_analysis():
 
     # Create sidebar filters for employee selection
     st.sidebar.subheader("Filters")
+    employee_index = None
     if 'Employee' in data.columns:
-        unique_employees = data['Employee'].unique()
+        employee_index = get_employee_index(st.session_state)
+        unique_employees = employee_index.employees
 
         if len(unique_employees) >= 5:
             default_selection = unique_employees[0:5].tolist()
@@ -24,7 +32,7 @@ def exploratory_data_analysis():
             default_selection = unique_employees.tolist()
 
         selected_employees = st.sidebar.multiselect("Filter by Employees:", unique_employees, default=default_selection)
-        data = data[data['Employee'].isin(selected_employees)]
+        data = employee_index.rows_for(selected_employees)
     else:
         st.warning("No 'Employee' column found in the data.")
 
@@ -38,8 +46,8 @@ def exploratory_data_analysis():
                            'Transportation (£)', 'Water Bill (£)', 'Sky Sports (£)', 'Other Expenses (£)',
                            'Monthly Outing (£)']
         selected_expense = st.selectbox("Select Expense Category:", expense_columns)
-        fig = px.bar(data, x='Employee', y=selected_expense, title=f"{selected_expense} by Employee")
-        st.plotly_chart(fig)
+        fig, note = charts.bar(data, x='Employee', y=selected_expense, title=f"{selected_expense} by Employee")
+        charts.show(fig, note)
 
         # Expense prediction for individual employee
         st.subheader("Expense Prediction for Individual Employee")
@@ -47,8 +55,8 @@ def exploratory_data_analysis():
         if not selected_employee:
             st.error("It is necessary to select at least one employee to proceed.")
         else:
-            employee_data = data[data['Employee'] == selected_employee]
-            first_month_expense = employee_data[selected_expense].iloc[0]
+            employee_data = employee_index.rows(selected_employee)
+            first_month_expense = float(employee_data[selected_expense].iloc[0])
             st.write(f"First Month's {selected_expense}: £{first_month_expense:.2f}")
 
             st.write("Enter your expected expenses for the next two months:")
@@ -65,19 +73,16 @@ def exploratory_data_analysis():
                 step=0.01
             )
 
-            X = np.array(range(len(employee_data) + 2)).reshape(-1, 1)
             y = np.concatenate([
                 employee_data[selected_expense].values,
                 [next_month_expense, second_month_expense]
             ])
 
-            # Create and train a linear regression model
-            model = LinearRegression()
-            model.fit(X, y)
+            # Closed-form least-squares trend over the month numbers
+            slope, intercept = fit_line(y)
 
             future_months = st.slider("Predict expenses for next n months:", 1, 12, 3)
-            future_X = np.array(range(len(X), len(X) + future_months)).reshape(-1, 1)
-            predictions = model.predict(future_X)
+            predictions = intercept + slope * np.arange(len(y), len(y) + future_months)
             historical_data = employee_data[selected_expense].values
             full_data = np.concatenate([historical_data, [next_month_expense, second_month_expense], predictions])
 
@@ -102,6 +107,13 @@ def exploratory_data_analysis():
             for i, pred in enumerate(predictions, 1):
                 st.write(f"Month {i}: £{pred:.2f}")
 
+            # Trends for every employee and expense are fitted together once per upload
+            st.subheader("Trend Forecasts for Selected Employees")
+            trends = cached_trends(st.session_state['uploaded_data'], dataset_key(st.session_state))
+            trend_employees = [employee for employee in selected_employees if employee in trends['slope'].index]
+            st.write(f"{selected_expense} for the next {future_months} months, from each employee's recorded months:")
+            st.dataframe(forecast(trends, selected_expense, trend_employees, future_months).style.format("£{:.2f}"))
+
     # Spending Category Distributions visualization
     elif selected_visualization == "Spending Category Distributions":
         st.subheader("Spending Category Distributions")
@@ -109,12 +121,17 @@ def exploratory_data_analysis():
             expense_columns = ['Electricity Bill (£)', 'Gas Bill (£)', 'Netflix (£)', 'Amazon Prime (£)',
                                'Groceries (£)', 'Transportation (£)', 'Water Bill (£)', 'Sky Sports (£)',
                                'Other Expenses (£)', 'Monthly Outing (£)']
-            total_expenses = data[expense_columns].sum()
+            # Per-employee category totals from analytics.py, when it has been run on this dataset
+            stage_results = load_results(dataset_key(st.session_state), 'eda')
+            if stage_results is not None and 'category_totals' in stage_results:
+                total_expenses = stage_results['category_totals'].loc[selected_employees, expense_columns].sum()
+            else:
+                total_expenses = data[expense_columns].sum()
             fig_pie = px.pie(values=total_expenses.values, names=total_expenses.index,
                              title="Overall Expense Distribution")
             st.plotly_chart(fig_pie)
             selected_employee = st.selectbox("Select Employee for Detailed Breakdown:", data['Employee'])
-            employee_expenses = data[data['Employee'] == selected_employee][expense_columns].iloc[0]
+            employee_expenses = employee_index.rows(selected_employee)[expense_columns].iloc[0]
             fig_employee_pie = px.pie(values=employee_expenses.values, names=employee_expenses.index,
                                       title=f"Expense Distribution for {selected_employee}")
             st.plotly_chart(fig_employee_pie)
@@ -125,17 +142,12 @@ def exploratory_data_analysis():
     elif selected_visualization == "Income vs Expenses":
         st.subheader("Income vs Expenses")
         try:
-            expense_columns = ['Electricity Bill (£)', 'Gas Bill (£)', 'Netflix (£)', 'Amazon Prime (£)',
-                               'Groceries (£)',
-                               'Transportation (£)', 'Water Bill (£)', 'Sky Sports (£)', 'Other Expenses (£)',
-                               'Monthly Outing (£)']
-            data['Total Expenses'] = data[expense_columns].sum(axis=1)
-            data['Savings'] = data['Savings for Property (£)']
-            fig = px.bar(data, x='Employee', y=['Monthly Income (£)', 'Total Expenses', 'Savings'],
-                         title="Income vs Expenses and Savings by Employee", barmode='group')
-            st.plotly_chart(fig)
-            data['Savings Percentage'] = (data['Savings'] / data['Monthly Income (£)'] * 100)
-            savings_percentage = data['Savings Percentage'].mean()
+            # Totals, savings and savings percentage are precomputed once per upload
+            totals = employee_index.totals_for(selected_employees)
+            fig, note = charts.bar(totals, x='Employee', y=['Monthly Income (£)', 'Total Expenses', 'Savings'],
+                                   title="Income vs Expenses and Savings by Employee", barmode='group')
+            charts.show(fig, note)
+            savings_percentage = totals['Savings Percentage'].mean()
 
             st.write(f"Average Savings Percentage: {savings_percentage:.2f}%")
         except Exception as e:
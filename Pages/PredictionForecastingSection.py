@@ -1,13 +1,19 @@
+import time
+import uuid
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-from statsmodels.tsa.arima.model import ARIMA
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.python.keras.models import Sequential
-from tensorflow.python.keras.layers import LSTM, Dense
-from prophet import Prophet
 
+from batch_forecast import employee_forecast_table, load_forecasts
+from data_access import dataset_key, get_employee_index
+from forecast_jobs import get_job_manager
+from forecasting import BASE_MONTHS, INPUT_MONTHS, LSTM_PARAMS, MODELS, build_history, employee_baseline, forecast_dates
+from profiling import profiled_page
+from results_store import load_results
+
+@profiled_page("Prediction & Forecasting")
 def prediction_forecasting():
     st.title("Savings Prediction & Forecasting for Individual Employees")
 
@@ -17,24 +23,28 @@ def prediction_forecasting():
     data = st.session_state['uploaded_data']
 
     if 'Employee' in data.columns:
-        unique_employees = data['Employee'].unique()
-        selected_employee = st.selectbox("Select Employee for Predictions:", unique_employees)
-        employee_data = data[data['Employee'] == selected_employee]
+        employee_index = get_employee_index(st.session_state)
+        selected_employee = st.selectbox("Select Employee for Predictions:", employee_index.employees)
+        employee_data = employee_index.rows(selected_employee)
 
         if employee_data.empty:
             st.error("No data found for the selected employee.")
             return
 
-        current_monthly_savings = employee_data['Savings for Property (£)'].iloc[0]
-        current_monthly_expenses = employee_data['Monthly Income (£)'].iloc[0] - current_monthly_savings
+        current_monthly_savings, current_monthly_expenses = employee_baseline(employee_data)
 
         st.subheader("Initial Values (Month 1)")
         st.write(f"Savings: £{current_monthly_savings:.2f}")
         st.write(f"Expenses: £{current_monthly_expenses:.2f}")
 
-        st.subheader("Input Changes for Next 5 Months")
+        # The LSTM trains on windows of the history, so it needs at least one month more than a window
+        min_months = LSTM_PARAMS['window'] + 1 - BASE_MONTHS
+        input_months = int(st.number_input("Months of input changes:", min_value=min_months, max_value=60,
+                                           value=INPUT_MONTHS))
+
+        st.subheader(f"Input Changes for Next {input_months} Months")
         changes = []
-        for i in range(5):
+        for i in range(input_months):
             col1, col2 = st.columns(2)
             with col1:
                 savings_change = st.number_input(f"Month {i + 2} Savings Change", value=current_monthly_savings, step=10.0)
@@ -42,85 +52,62 @@ def prediction_forecasting():
                 expenses_change = st.number_input(f"Month {i + 2} Expenses Change", value=current_monthly_expenses, step=10.0)
             changes.append((savings_change, expenses_change))
 
-        next_month = pd.Timestamp.now() + pd.DateOffset(months=1)
-        next_month_start = next_month.replace(day=1)
-        dates = pd.date_range(start=next_month_start, periods=5, freq='M')
-
-        savings = [current_monthly_savings] * 5
-        expenses = [current_monthly_expenses] * 5
-
-        df = pd.DataFrame({'ds': dates, 'savings': savings, 'expenses': expenses})
-
-        for i, (savings_change, expenses_change) in enumerate(changes):
-            new_date = df['ds'].iloc[-1] + pd.DateOffset(months=i + 1)
-            new_savings = df['savings'].iloc[-1] + savings_change - current_monthly_savings
-            new_expenses = df['expenses'].iloc[-1] + expenses_change - current_monthly_expenses
-            new_row = pd.DataFrame({'ds': [new_date], 'savings': [new_savings], 'expenses': [new_expenses]})
-            df = pd.concat([df, new_row], ignore_index=True)
-
-        predictions_summary = {}
-
-        # ARIMA Model
-        arima_model = ARIMA(df['savings'], order=(1, 1, 1))
-        arima_results = arima_model.fit()
-        arima_forecast = arima_results.forecast(steps=6)
-        predictions_summary['ARIMA Forecast'] = arima_forecast.values.tolist()
-
-        # LSTM Model
-        scaler = MinMaxScaler()
-        scaled_data = scaler.fit_transform(df[['savings', 'expenses']])
-
-        X, y = [], []
-        for i in range(len(scaled_data) - 6):
-            X.append(scaled_data[i:i + 6])
-            y.append(scaled_data[i + 6])
-        X, y = np.array(X), np.array(y)
-        model = Sequential([
-            LSTM(50, activation='relu', input_shape=(6, 2)),
-            Dense(2)
-        ])
-        model.compile(optimizer='adam', loss='mse')
-        model.fit(X, y, epochs=50, verbose=0)
-        last_6_months = scaled_data[-6:]
-        lstm_forecast = []
-
-        for _ in range(6):
-            next_month = model.predict(last_6_months.reshape(1, 6, 2))
-            lstm_forecast.append(next_month[0])
-            last_6_months = np.vstack((last_6_months[1:], next_month))
-        lstm_forecast_inv_scaled = scaler.inverse_transform(lstm_forecast)
-        predictions_summary['LSTM Forecast'] = lstm_forecast_inv_scaled[:, 0].tolist()
-
-        # Prophet Model
-        prophet_df = df[['ds', 'savings']].rename(columns={'savings': 'y'})
-        m = Prophet()
-        m.fit(prophet_df)
-        future = m.make_future_dataframe(periods=2, freq='ME')
-        forecast_prophet = m.predict(future)
-        predictions_summary['Prophet Forecast'] = forecast_prophet['yhat'].tail(6).values.tolist()
-
-        # Create DataFrame for plotting with adjusted future dates starting from five months from today
-        future_dates_arima_lstm = pd.date_range(start=pd.Timestamp.now() + pd.DateOffset(months=5), periods=6, freq='M')
-
-        plot_df = pd.DataFrame({
-            'Date': future_dates_arima_lstm,
-            'ARIMA Forecast': predictions_summary['ARIMA Forecast'],
-            'LSTM Forecast': predictions_summary['LSTM Forecast'],
-            'Prophet Forecast': predictions_summary['Prophet Forecast']
-        })
-
-        # Plotting using Plotly
-        fig = px.line(plot_df, x='Date',
-                      y=['ARIMA Forecast', 'LSTM Forecast', 'Prophet Forecast'],
-                      labels={'value': 'Savings (£)', 'variable': 'Model'},
-                      title=f"Savings Forecast for {selected_employee}")
-
-        st.plotly_chart(fig)
-
-        st.subheader("Predictions Summary for Savings")
-        # summary with future dates
-        plot_df['Date'] += pd.DateOffset(months=0)
-        st.write(plot_df)
+        # Unedited inputs can be served from the headless batch run (python batch_forecast.py data.csv)
+        plot_df = None
+        if input_months == INPUT_MONTHS and all(
+                change == (current_monthly_savings, current_monthly_expenses) for change in changes):
+            # Prefer the analytics.py run for this exact dataset, then the standalone batch output
+            # if it was computed from the same file
+            key = dataset_key(st.session_state)
+            stage_results = load_results(key, 'forecasting')
+            precomputed = stage_results['forecasts'] if stage_results else load_forecasts(key)
+            if precomputed is not None:
+                plot_df = employee_forecast_table(precomputed, selected_employee)
+
+        job = None
+        if plot_df is None:
+            df = build_history(current_monthly_savings, current_monthly_expenses, changes)
+
+            # ARIMA, LSTM and Prophet train as background jobs; editing an input cancels the
+            # superseded job, and each model's forecast is drawn as soon as it finishes
+            owner = st.session_state.setdefault('forecast_job_owner', uuid.uuid4().hex)
+            job = get_job_manager().submit(owner, df)
+
+            # Create DataFrame for plotting with adjusted future dates starting from five months from today
+            plot_df = pd.DataFrame({'Date': forecast_dates()})
+            for model_name in MODELS:
+                forecast = job.result(model_name)
+                if forecast is not None:
+                    plot_df[f"{model_name} Forecast"] = forecast
+
+            finished = sum(job.status(model_name) in ('done', 'failed') for model_name in MODELS)
+            st.progress(job.progress(), text=f"Forecast job {job.id[:8]}: {finished} of {len(MODELS)} models finished")
+            for model_name in MODELS:
+                status = job.status(model_name)
+                if status == 'failed':
+                    st.error(f"{model_name} forecast failed: {job.error(model_name)}")
+                elif status in ('queued', 'running'):
+                    st.info(f"{model_name} model is {status}...")
+
+        forecast_columns = [column for column in plot_df.columns if column != 'Date']
+        if forecast_columns:
+            # Plotting using Plotly
+            fig = px.line(plot_df, x='Date',
+                          y=forecast_columns,
+                          labels={'value': 'Savings (£)', 'variable': 'Model'},
+                          title=f"Savings Forecast for {selected_employee}")
+
+            st.plotly_chart(fig)
+
+            st.subheader("Predictions Summary for Savings")
+            # summary with future dates
+            plot_df['Date'] += pd.DateOffset(months=0)
+            st.write(plot_df)
+
+        # Poll until every model has finished; the page stays interactive between polls
+        if job is not None and not job.done():
+            time.sleep(1)
+            st.rerun()
     else:
         st.warning("No 'Employee' column found in the data.")
 
@@ -0,0 +1,114 @@
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dataset_store import load_frame, load_or_ingest
+from ingestion import read_finance_csv, read_finance_parquet
+from results_store import RESULTS_DIR, save_results
+
+# Headless runner for the page analytics: python analytics.py data.csv --stages eda correlation --jobs 3
+# Results are saved under the dataset's digest, and the Streamlit pages load them instead of
+# recomputing when the same file is uploaded.
+
+
+def eda_stage(data):
+    from data_access import category_totals
+    from trend import fit_trends, trends_to_frames
+
+    return {'category_totals': category_totals(data), **trends_to_frames(fit_trends(data))}
+
+
+def clustering_stage(data):
+    from clustering import LARGE_DATA_ROWS, cluster_sweep, prepare_features, sweep_to_frames
+
+    # Same default mode the page picks for this many rows
+    large = len(data) > LARGE_DATA_ROWS
+    sweep = cluster_sweep(*prepare_features(data, large=large), large=large)
+    return sweep_to_frames(sweep, large=large)
+
+
+def correlation_stage(data):
+    from correlation import METHODS, correlation_matrix
+
+    return {method: correlation_matrix(data, method=method) for method in METHODS}
+
+
+def decisions_stage(data):
+    from savings_simulator import employee_inputs
+
+    # The per-employee values every savings goal is simulated from; any goals the page is asked
+    # about are then a vectorized pass over one row per employee
+    return {'employee_inputs': employee_inputs(data)}
+
+
+def forecasting_stage(data):
+    from batch_forecast import run_batch
+
+    return {'forecasts': run_batch(data)}
+
+
+STAGES = {
+    'eda': eda_stage,
+    'clustering': clustering_stage,
+    'correlation': correlation_stage,
+    'decisions': decisions_stage,
+    'forecasting': forecasting_stage,
+}
+# Stages that manage their own process pools and so run in the parent process
+SELF_PARALLEL_STAGES = {'forecasting'}
+
+
+def run_stage(digest, stage):
+    # Workers map the stored dataset by digest instead of receiving a pickled copy
+    start = time.perf_counter()
+    frames = STAGES[stage](load_frame(digest))
+    save_results(digest, stage, frames)
+    return stage, time.perf_counter() - start
+
+
+def load_dataset(path):
+    # Parquet exports get the same schema, validation and imputation as CSV uploads, since the
+    # digest they are stored under stands for the current cleaning pipeline
+    ingest = read_finance_parquet if path.endswith('.parquet') else read_finance_csv
+    digest, data, _ = load_or_ingest(path, ingest)
+    return digest, data
+
+
+def run(path, stages, jobs=1):
+    digest, _ = load_dataset(path)
+    pooled = [stage for stage in stages if stage not in SELF_PARALLEL_STAGES]
+    timings = {}
+
+    if jobs > 1 and len(pooled) > 1:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            futures = [pool.submit(run_stage, digest, stage) for stage in pooled]
+            for future in as_completed(futures):
+                stage, elapsed = future.result()
+                timings[stage] = elapsed
+    else:
+        for stage in pooled:
+            timings[stage] = run_stage(digest, stage)[1]
+
+    for stage in stages:
+        if stage in SELF_PARALLEL_STAGES:
+            timings[stage] = run_stage(digest, stage)[1]
+    return digest, timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the Streamlit page analytics for a dataset.")
+    parser.add_argument('input', help="Employee finance CSV or Parquet file")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--jobs', type=int, default=1, help="Run independent stages in this many processes")
+    args = parser.parse_args(argv)
+
+    digest, timings = run(args.input, args.stages, jobs=args.jobs)
+    print(f"Dataset {digest}: results in {RESULTS_DIR}/{digest}")
+    for stage, elapsed in timings.items():
+        print(f"  {stage:<12} {elapsed:8.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+import argparse
+import multiprocessing
+import os
+import signal
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from dataset_store import content_digest
+from ingestion import read_finance_csv
+
+# Default location the Streamlit forecasting page reads precomputed results from. Every row
+# carries the digest of the input file, and the page only serves rows for its own upload.
+FORECASTS_PATH = os.environ.get('FORECASTS_PATH', 'employee_forecasts.csv')
+
+MODEL_NAMES = ['ARIMA', 'LSTM', 'Prophet']
+# Most LSTM processes by default; TensorFlow already runs each fit on several threads
+MAX_LSTM_WORKERS = 2
+DEFAULT_TIMEOUTS = {'ARIMA': 60, 'LSTM': 300, 'Prophet': 120}
+# Employees per pooled LSTM fit; the LSTM timeout applies to a whole chunk
+LSTM_CHUNK_SIZE = 1024
+
+
+class ForecastTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise ForecastTimeout()
+
+
+def _unchanged_history(current_savings, current_expenses):
+    # The history the page builds before the user edits any month inputs
+    from forecasting import INPUT_MONTHS, build_history
+
+    return build_history(current_savings, current_expenses, [(current_savings, current_expenses)] * INPUT_MONTHS)
+
+
+def _run_with_timeout(model_name, employees, timeout, fit):
+    # Runs inside a worker process; imports forecasting lazily so the parent stays light
+    use_alarm = timeout and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        forecasts = fit()
+        return [(employee, model_name, 'ok', forecast, '') for employee, forecast in zip(employees, forecasts)]
+    except ForecastTimeout:
+        return [(employee, model_name, 'timeout', [], f"exceeded {timeout}s") for employee in employees]
+    except Exception:
+        message = traceback.format_exc(limit=1)
+        return [(employee, model_name, 'error', [], message) for employee in employees]
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _forecast_task(model_name, employee, current_savings, current_expenses, timeout):
+    from forecasting import cached_forecast
+
+    def fit():
+        _, forecast = cached_forecast(model_name, _unchanged_history(current_savings, current_expenses))
+        return [forecast]
+
+    return _run_with_timeout(model_name, [employee], timeout, fit)
+
+
+def _lstm_chunk_task(baselines, timeout):
+    # One pooled LSTM for the chunk, so inference is a single batched pass per horizon step
+    import numpy as np
+    from forecasting import INPUT_MONTHS, LSTM_PARAMS, build_histories, fit_lstm_batch
+
+    employees = [employee for employee, _, _ in baselines]
+
+    def fit():
+        savings = np.array([savings for _, savings, _ in baselines])
+        expenses = np.array([expenses for _, _, expenses in baselines])
+        unchanged = np.repeat(np.stack([savings, expenses], axis=-1)[:, None], INPUT_MONTHS, axis=1)
+        histories = build_histories(savings, expenses, unchanged)
+        _, forecasts = fit_lstm_batch(histories, **LSTM_PARAMS)
+        return forecasts.tolist()
+
+    return _run_with_timeout('LSTM', employees, timeout, fit)
+
+
+def employee_baselines(data):
+    from forecasting import employee_baseline
+
+    baselines = []
+    for employee, employee_data in data.groupby('Employee', sort=False, observed=True):
+        current_savings, current_expenses = employee_baseline(employee_data)
+        baselines.append((employee, current_savings, current_expenses))
+    return baselines
+
+
+def default_workers(models, cpus=None):
+    # The model pools run at the same time, so they share one budget of CPUs (one worker per
+    # model at least): the LSTM gets its share up to MAX_LSTM_WORKERS, the rest is split evenly
+    cpus = cpus or os.cpu_count() or 1
+    workers = {}
+    if 'LSTM' in models:
+        workers['LSTM'] = max(1, min(MAX_LSTM_WORKERS, cpus // len(models)))
+    others = [name for name in models if name != 'LSTM']
+    remaining = cpus - workers.get('LSTM', 0)
+    for i, name in enumerate(others):
+        workers[name] = max(1, remaining // len(others) + (i < remaining % len(others)))
+    return workers
+
+
+def run_batch(data, models=None, workers=None, timeouts=None, cpus=None):
+    from forecasting import forecast_dates
+
+    models = models or MODEL_NAMES
+    workers = {**default_workers(models, cpus), **(workers or {})}
+    timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+    baselines = employee_baselines(data)
+    dates = forecast_dates()
+
+    # One pool per model so heavy backends (TensorFlow) can be given fewer workers
+    context = multiprocessing.get_context('spawn')
+    pools = {name: ProcessPoolExecutor(max_workers=workers[name], mp_context=context) for name in models}
+    rows = []
+    try:
+        futures = []
+        for name in models:
+            if name == 'LSTM':
+                futures.extend(
+                    pools[name].submit(_lstm_chunk_task, baselines[start:start + LSTM_CHUNK_SIZE], timeouts[name])
+                    for start in range(0, len(baselines), LSTM_CHUNK_SIZE)
+                )
+            else:
+                futures.extend(
+                    pools[name].submit(_forecast_task, name, employee, savings, expenses, timeouts[name])
+                    for employee, savings, expenses in baselines
+                )
+        for future in as_completed(futures):
+            for employee, model_name, status, forecast, message in future.result():
+                if status == 'ok':
+                    for step, (date, value) in enumerate(zip(dates, forecast), 1):
+                        rows.append((employee, model_name, step, date, value, status, message))
+                else:
+                    rows.append((employee, model_name, None, None, None, status, message))
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    results = pd.DataFrame(rows, columns=['Employee', 'Model', 'Step', 'Date', 'Forecast', 'Status', 'Message'])
+    return results.sort_values(['Employee', 'Model', 'Step'], ignore_index=True)
+
+
+def write_forecasts(results, path):
+    if path.endswith('.parquet'):
+        results.to_parquet(path, index=False)
+    else:
+        results.to_csv(path, index=False)
+
+
+_loaded_forecasts = {}
+
+
+def load_forecasts(dataset_key, path=FORECASTS_PATH):
+    # The batch table when it was computed from the same file content, otherwise None.
+    # Re-read only when the batch output file changes on disk.
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    if path in _loaded_forecasts and _loaded_forecasts[path][0] == mtime:
+        results = _loaded_forecasts[path][1]
+    else:
+        if path.endswith('.parquet'):
+            results = pd.read_parquet(path)
+        else:
+            results = pd.read_csv(path, parse_dates=['Date'])
+        _loaded_forecasts[path] = (mtime, results)
+    # Tables written before the digest column existed can't be matched to an upload
+    if 'Dataset' not in results.columns or not (results['Dataset'] == dataset_key).all():
+        return None
+    return results
+
+
+def employee_forecast_table(results, employee):
+    # Wide Date x Model table for one employee, or None when it was not precomputed successfully
+    from forecasting import forecast_dates
+
+    employee_results = results[(results['Employee'] == employee) & (results['Status'] == 'ok')]
+    if employee_results['Model'].nunique() < len(MODEL_NAMES):
+        return None
+    table = employee_results.pivot(index='Step', columns='Model', values='Forecast')
+    table.columns = [f"{name} Forecast" for name in table.columns]
+    # Dates are relative to today, as for a live fit, not to the day the batch ran
+    steps = table.index.to_numpy(dtype=int)
+    table.insert(0, 'Date', forecast_dates(steps.max())[steps - 1])
+    return table.reset_index(drop=True)
+
+
+def _parse_model_values(pairs, cast):
+    values = {}
+    for pair in pairs or []:
+        name, _, value = pair.partition('=')
+        if name not in MODEL_NAMES:
+            raise argparse.ArgumentTypeError(f"Unknown model '{name}', expected one of {MODEL_NAMES}")
+        values[name] = cast(value)
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit ARIMA, LSTM and Prophet savings forecasts for every employee.")
+    parser.add_argument('input', help="Employee finance CSV file")
+    parser.add_argument('-o', '--output', default=FORECASTS_PATH, help="Consolidated forecast table (.csv or .parquet)")
+    parser.add_argument('--models', nargs='+', choices=MODEL_NAMES, default=MODEL_NAMES)
+    parser.add_argument('--cpus', type=int, help="CPUs shared by all model pools (default: all)")
+    parser.add_argument('--workers', nargs='*', metavar='MODEL=N',
+                        help="Worker processes per model, overriding its share of --cpus, e.g. LSTM=2")
+    parser.add_argument('--timeout', nargs='*', metavar='MODEL=SECONDS', help="Per-fit timeout, e.g. Prophet=60")
+    args = parser.parse_args(argv)
+
+    data, _ = read_finance_csv(args.input)
+    results = run_batch(
+        data,
+        models=args.models,
+        workers=_parse_model_values(args.workers, int),
+        cpus=args.cpus,
+        timeouts=_parse_model_values(args.timeout, float),
+    )
+    results.insert(0, 'Dataset', content_digest(args.input))
+    write_forecasts(results, args.output)
+
+    status_counts = results.drop_duplicates(['Employee', 'Model'])['Status'].value_counts().to_dict()
+    print(f"Wrote {len(results)} forecast rows for {results['Employee'].nunique()} employees to {args.output}: {status_counts}")
+
+
+if __name__ == '__main__':
+    main()
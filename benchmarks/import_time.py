@@ -0,0 +1,65 @@
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports one page module in a clean interpreter and reports how long it took.
+# Pages only define functions at import time, so this is the cold-start cost
+# Streamlit pays before the first pixel of that page renders.
+_PROBE = """
+import importlib.util, json, sys, time
+sys.path.insert(0, {root!r})
+before = set(sys.modules)
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('page_under_test', {path!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+elapsed = time.perf_counter() - start
+heavy = [name for name in ('tensorflow', 'prophet', 'statsmodels', 'sklearn', 'matplotlib', 'seaborn')
+         if name in sys.modules and name not in before]
+print(json.dumps({{'seconds': elapsed, 'modules': len(set(sys.modules) - before), 'heavy': heavy}}))
+"""
+
+
+def measure_page(path, repeat=3):
+    runs = []
+    for _ in range(repeat):
+        probe = _PROBE.format(root=REPO_ROOT, path=path)
+        completed = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, cwd=REPO_ROOT)
+        if completed.returncode != 0:
+            return {'page': os.path.basename(path), 'error': completed.stderr.strip().splitlines()[-1]}
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {
+        'page': os.path.basename(path),
+        'best_seconds': min(run['seconds'] for run in runs),
+        'modules_imported': runs[0]['modules'],
+        'heavy_backends': runs[0]['heavy'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import time of each Streamlit page.")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters per page; the best run is reported")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args(argv)
+
+    pages = sorted(glob.glob(os.path.join(REPO_ROOT, 'Pages', '*.py')))
+    results = [measure_page(path, args.repeat) for path in pages]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        if 'error' in result:
+            print(f"{result['page']:<36} failed: {result['error']}")
+        else:
+            heavy = ', '.join(result['heavy_backends']) or '-'
+            print(f"{result['page']:<36} {result['best_seconds']:7.3f}s  {result['modules_imported']:5d} modules  heavy: {heavy}")
+
+
+if __name__ == '__main__':
+    main()
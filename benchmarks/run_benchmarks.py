@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd  # noqa: E402
+
+from profiling import TRACE_MEMORY, traced_peak  # noqa: E402
+from synthetic_data import generate_payroll  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+STAGES = ['ingest', 'impute', 'eda', 'clustering', 'correlation', 'forecast']
+
+
+def measure(func, memory=True):
+    # Wall and CPU time of one untraced call; tracemalloc slows allocation by a stage-dependent
+    # amount, so the peak traced allocation comes from a second, separate call
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        result = func()
+    except Exception as e:
+        return None, {'wall_seconds': None, 'cpu_seconds': None, 'peak_bytes': None,
+                      'error': f"{type(e).__name__}: {e}"}
+    timings = {
+        'wall_seconds': time.perf_counter() - wall,
+        'cpu_seconds': time.process_time() - cpu,
+        'peak_bytes': None,
+    }
+    if memory:
+        # Shares tracing with profiling.py, so stages profiled inside func (and PROFILE_MEMORY=1)
+        # don't reset or stop the tracing this peak is read from
+        with traced_peak() as traced:
+            func()
+        timings['peak_bytes'] = traced['peak_bytes']
+    return result, timings
+
+
+def bench_size(n_rows, months, stages, forecast_employees, memory=True):
+    from clustering import LARGE_DATA_ROWS, fit_clusters, prepare_features
+    from correlation import correlation_matrix
+    from data_access import EmployeeIndex
+    from imputation import Imputer
+    from ingestion import read_finance_csv
+    from trend import fit_trends
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'payroll.csv')
+        generate_payroll(n_rows, months).to_csv(path, index=False)
+
+        def record(stage, func):
+            if stage not in stages:
+                return None
+            value, timings = measure(func, memory)
+            results.append({'stage': stage, 'rows': n_rows, **timings})
+            return value
+
+        # LSTM.py upload path: chunked, schema-typed CSV read (including imputation)
+        ingested = record('ingest', lambda: read_finance_csv(path, track_memory=False))
+        data = ingested[0] if ingested else read_finance_csv(path, track_memory=False)[0]
+
+        # FIllColumns.py: imputation of the raw, gap-filled export
+        raw = pd.read_csv(path)
+        record('impute', lambda: Imputer().fit_transform(raw))
+        del raw
+
+        # EDA page: employee index, totals and all-employee trend fits
+        record('eda', lambda: (EmployeeIndex(data), fit_trends(data)))
+
+        # Clustering page: scaling, PCA and one KMeans fit in the mode the page would pick
+        large = n_rows > LARGE_DATA_ROWS
+        record('clustering', lambda: fit_clusters(*prepare_features(data, large=large), 3, large=large))
+
+        record('correlation', lambda: correlation_matrix(data))
+
+        if 'forecast' in stages:
+            from forecasting import INPUT_MONTHS, MODELS, build_history, employee_baseline
+
+            # The page's default history (unchanged month inputs) for the first few employees
+            first_rows = data.groupby('Employee', sort=False, observed=True).head(1).head(forecast_employees)
+            baselines = [employee_baseline(first_rows.iloc[[i]]) for i in range(len(first_rows))]
+            histories = [build_history(savings, expenses, [(savings, expenses)] * INPUT_MONTHS)
+                         for savings, expenses in baselines]
+            for name, (fit, params) in MODELS.items():
+                value, timings = measure(lambda: [fit(history, **params) for history in histories], memory)
+                results.append({'stage': f"forecast_{name.lower()}", 'rows': n_rows,
+                                'employees': len(histories), **timings})
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, tolerance):
+    # Stages whose wall time grew by more than `tolerance` against a previous run
+    with open(baseline_path) as f:
+        baseline = {(r['stage'], r['rows']): r for r in json.load(f)['results'] if 'error' not in r}
+    regressions = []
+    for result in results:
+        previous = baseline.get((result['stage'], result['rows']))
+        if previous and 'error' not in result and result['wall_seconds'] > previous['wall_seconds'] * (1 + tolerance):
+            regressions.append((result['stage'], result['rows'], previous['wall_seconds'], result['wall_seconds']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and memory-profile every page's hot path on synthetic data.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Row counts to generate")
+    parser.add_argument('--months', type=int, default=12, help="Monthly rows per employee")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--forecast-employees', type=int, default=3,
+                        help="Employees to fit ARIMA/LSTM/Prophet for (these fits don't scale with rows)")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip the second, tracemalloc-traced call per stage that measures peak memory")
+    parser.add_argument('-o', '--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="Previous results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed wall-time growth before flagging")
+    args = parser.parse_args(argv)
+
+    if TRACE_MEMORY:
+        print("PROFILE_MEMORY=1 keeps tracemalloc on for the whole run, so wall and CPU times include tracing")
+    results = []
+    for n_rows in args.sizes:
+        size_results = bench_size(n_rows, args.months, args.stages, args.forecast_employees,
+                                  memory=not args.no_memory)
+        for result in size_results:
+            status = result.get('error') or f"{result['wall_seconds']:8.3f}s wall"
+            if result['peak_bytes'] is not None:
+                status += f" {result['peak_bytes'] / 1e6:9.1f} MB peak"
+            print(f"{n_rows:>10,} rows  {result['stage']:<18} {status}")
+        results.extend(size_results)
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for stage, n_rows, before, after in regressions:
+            print(f"REGRESSION {stage} at {n_rows:,} rows: {before:.3f}s -> {after:.3f}s")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
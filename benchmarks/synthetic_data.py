@@ -0,0 +1,63 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Typical monthly amounts (mean, spread) for each personal_finance_employees column
+COLUMN_PROFILES = {
+    'Monthly Income (£)': (3200, 900),
+    'Water Bill (£)': (40, 10),
+    'Electricity Bill (£)': (90, 25),
+    'Gas Bill (£)': (70, 20),
+    'Groceries (£)': (320, 80),
+    'Transportation (£)': (150, 60),
+    'Sky Sports (£)': (25, 15),
+    'Other Expenses (£)': (200, 90),
+    'Savings for Property (£)': (400, 250),
+    'Monthly Outing (£)': (120, 60),
+    'Netflix (£)': (10.99, 3),
+    'Amazon Prime (£)': (8.99, 1),
+}
+# Columns left partly empty in the real export, which FIllColumns.py fills
+MISSING_RATES = {
+    'Water Bill (£)': 0.05,
+    'Sky Sports (£)': 0.3,
+    'Other Expenses (£)': 0.1,
+    'Savings for Property (£)': 0.05,
+    'Monthly Outing (£)': 0.08,
+}
+
+
+def generate_payroll(n_rows, months=12, seed=0):
+    # n_rows rows spread over employees with `months` consecutive monthly rows each
+    rng = np.random.default_rng(seed)
+    n_employees = max(1, -(-n_rows // months))
+    employee_ids = np.repeat(np.arange(n_employees), months)[:n_rows]
+    month_numbers = np.tile(np.arange(months), n_employees)[:n_rows]
+
+    frame = {'Employee': pd.Categorical.from_codes(employee_ids, [f"Employee {i + 1}" for i in range(n_employees)])}
+    for column, (mean, spread) in COLUMN_PROFILES.items():
+        # A per-employee level plus month-to-month noise and a small drift
+        level = rng.normal(mean, spread, n_employees)[employee_ids]
+        drift = rng.normal(0, spread * 0.01, n_employees)[employee_ids] * month_numbers
+        values = np.maximum(level + drift + rng.normal(0, spread * 0.1, n_rows), 0).round(2)
+        if column in MISSING_RATES:
+            values[rng.random(n_rows) < MISSING_RATES[column]] = np.nan
+        frame[column] = values
+    return pd.DataFrame(frame)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic personal_finance_employees-shaped CSV.")
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--months', type=int, default=12, help="Monthly rows per employee")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='synthetic_personal_finance_employees.csv')
+    args = parser.parse_args(argv)
+
+    generate_payroll(args.rows, args.months, args.seed).to_csv(args.output, index=False)
+    print(f"Wrote {args.rows:,} rows to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
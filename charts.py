@@ -0,0 +1,53 @@
+import plotly.express as px
+import streamlit as st
+
+from profiling import debug_panel_open, profile_stage
+
+# Above this many markers scatter plots switch to WebGL (scattergl) traces
+WEBGL_THRESHOLD = 5_000
+# Most markers/bars ever sent to the browser; larger inputs are sampled or capped
+MAX_SCATTER_POINTS = 20_000
+MAX_BARS = 500
+
+
+def payload_size(fig):
+    return len(fig.to_json())
+
+
+def scatter(df, x, y, color=None, max_points=MAX_SCATTER_POINTS, **kwargs):
+    # Returns (figure, note); large inputs are sampled per colour group so every group keeps its share
+    note = f"{len(df):,} points"
+    if len(df) > max_points:
+        fraction = max_points / len(df)
+        df = df.groupby(color, group_keys=False).sample(frac=fraction, random_state=0) if color \
+            else df.sample(n=max_points, random_state=0)
+        note = f"{len(df):,} of {note} shown (sampled)"
+    render_mode = 'webgl' if len(df) > WEBGL_THRESHOLD else 'auto'
+    fig = px.scatter(df, x=x, y=y, color=color, render_mode=render_mode, **kwargs)
+    return fig, note
+
+
+def bar(df, x, y, max_bars=MAX_BARS, **kwargs):
+    # Returns (figure, note). Repeated categories are summed, which is how plotly stacks them
+    # anyway, so bar heights are the same at every data size; beyond max_bars categories only
+    # the largest totals are drawn.
+    y_columns = y if isinstance(y, list) else [y]
+    note = f"{len(df):,} rows"
+    if df[x].duplicated().any():
+        df = df.groupby(x, sort=False, observed=True)[y_columns].sum().reset_index()
+        note += f" summed per {x}"
+    if len(df) > max_bars:
+        n_categories = len(df)
+        df = df.loc[df[y_columns].sum(axis=1).nlargest(max_bars).index]
+        note = f"Top {max_bars:,} of {n_categories:,} by total ({note})"
+    return px.bar(df, x=x, y=y, **kwargs), note
+
+
+def show(fig, note=None):
+    with profile_stage('plotly_render'):
+        st.plotly_chart(fig)
+    # Serializing the figure again just to measure it is only worth it while profiling
+    if debug_panel_open():
+        note = f"{note + ' · ' if note else ''}{payload_size(fig) / 1024:,.0f} KB chart payload"
+    if note:
+        st.caption(note)
@@ -0,0 +1,187 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+from imputation import impute_columns
+from model_cache import ModelCache
+from profiling import profiled
+from results_store import load_results
+
+CLUSTER_FEATURES = ['Electricity Bill (£)', 'Gas Bill (£)', 'Groceries (£)',
+                    'Transportation (£)', 'Water Bill (£)', 'Sky Sports (£)', 'Other Expenses (£)',
+                    'Monthly Outing (£)']
+# Above this many rows the page defaults to the chunked MiniBatchKMeans / IncrementalPCA mode
+LARGE_DATA_ROWS = 50_000
+CHUNK_SIZE = 10_000
+SWEEP_KS = range(2, 11)
+# Silhouette is quadratic in rows, so above this it is estimated on a random sample
+SILHOUETTE_SAMPLE_SIZE = 10_000
+
+# Scaled features and the 2-D projection don't depend on k, so they are cached separately from
+# the per-k fits; moving the slider back to a k seen before is a dictionary lookup.
+_cache = ModelCache(max_entries=64)
+
+
+@dataclass
+class ClusterResult:
+    labels: np.ndarray
+    embedding: np.ndarray
+    profiles: pd.DataFrame
+    inertia: float
+
+
+def _chunks(n_rows, chunk_size):
+    return [slice(start, start + chunk_size) for start in range(0, n_rows, chunk_size)]
+
+
+@profiled('clustering_scale_pca')
+def prepare_features(data, large=False, chunk_size=CHUNK_SIZE):
+    # Returns (features, scaled matrix, 2-D PCA embedding)
+    features = impute_columns(data[CLUSTER_FEATURES], CLUSTER_FEATURES)
+    if not large:
+        scaled = StandardScaler().fit_transform(features)
+        return features, scaled, PCA(n_components=2).fit_transform(scaled)
+
+    values = features.to_numpy(dtype=np.float32)
+    chunks = _chunks(len(values), chunk_size)
+    scaler = StandardScaler()
+    for chunk in chunks:
+        scaler.partial_fit(values[chunk])
+    scaled = np.empty_like(values)
+    for chunk in chunks:
+        scaled[chunk] = scaler.transform(values[chunk])
+
+    # IncrementalPCA needs at least n_components rows per batch, so a shorter tail is only transformed
+    pca = IncrementalPCA(n_components=2)
+    for chunk in chunks:
+        if scaled[chunk].shape[0] >= 2:
+            pca.partial_fit(scaled[chunk])
+    embedding = np.empty((len(scaled), 2), dtype=np.float32)
+    for chunk in chunks:
+        embedding[chunk] = pca.transform(scaled[chunk])
+    return features, scaled, embedding
+
+
+@profiled('kmeans_fit')
+def fit_clusters(features, scaled, embedding, n_clusters, large=False, chunk_size=CHUNK_SIZE):
+    if large:
+        model = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, batch_size=chunk_size, n_init=3)
+        chunks = _chunks(len(scaled), chunk_size)
+        for chunk in chunks:
+            if scaled[chunk].shape[0] >= n_clusters:
+                model.partial_fit(scaled[chunk])
+        labels = np.concatenate([model.predict(scaled[chunk]) for chunk in chunks])
+        inertia = float(-model.score(scaled))
+    else:
+        model = KMeans(n_clusters=n_clusters, random_state=42)
+        labels = model.fit_predict(scaled)
+        inertia = float(model.inertia_)
+
+    # Per-cluster means in one grouped pass
+    profiles = features.groupby(labels).mean()
+    return ClusterResult(labels=labels, embedding=embedding, profiles=profiles, inertia=inertia)
+
+
+@dataclass
+class SweepResult:
+    results: dict
+    scores: pd.DataFrame
+    recommended_k: int
+    elbow_k: int
+
+
+def _elbow(ks, inertias):
+    # The k furthest below the straight line joining the first and last inertia
+    ks, inertias = np.asarray(ks, dtype=float), np.asarray(inertias, dtype=float)
+    if len(ks) < 3:
+        return int(ks[0])
+    line = inertias[0] + (inertias[-1] - inertias[0]) * (ks - ks[0]) / (ks[-1] - ks[0])
+    return int(ks[np.argmax(line - inertias)])
+
+
+@profiled('cluster_sweep')
+def cluster_sweep(features, scaled, embedding, ks=SWEEP_KS, large=False, max_workers=None):
+    # Fits every k on the same scaled matrix in parallel threads; the heavy sklearn kernels release the GIL
+    ks = [k for k in ks if k < len(scaled)]
+    sample_size = SILHOUETTE_SAMPLE_SIZE if len(scaled) > SILHOUETTE_SAMPLE_SIZE else None
+
+    def fit_and_score(k):
+        result = fit_clusters(features, scaled, embedding, k, large=large)
+        silhouette = silhouette_score(scaled, result.labels, sample_size=sample_size, random_state=42)
+        return result, float(silhouette)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        fitted = list(pool.map(fit_and_score, ks))
+
+    results = {k: result for k, (result, _) in zip(ks, fitted)}
+    scores = pd.DataFrame({
+        'k': ks,
+        'Inertia': [result.inertia for result, _ in fitted],
+        'Silhouette': [silhouette for _, silhouette in fitted],
+    })
+    return SweepResult(
+        results=results,
+        scores=scores,
+        recommended_k=int(scores.loc[scores['Silhouette'].idxmax(), 'k']),
+        elbow_k=_elbow(scores['k'], scores['Inertia']),
+    )
+
+
+def sweep_to_frames(sweep, large=False):
+    # Flat tables for the results store: scores, plus the 2-D embedding and the labels of every k
+    embedding = next(iter(sweep.results.values())).embedding
+    assignments = pd.DataFrame({'Expense Dimension 1': embedding[:, 0], 'Expense Dimension 2': embedding[:, 1]})
+    for k, result in sweep.results.items():
+        assignments[f"k={k}"] = result.labels
+    return {'scores': sweep.scores, 'assignments': assignments, 'mode': pd.DataFrame({'large': [large]})}
+
+
+def sweep_from_frames(data, frames):
+    scores, assignments = frames['scores'], frames['assignments']
+    features = impute_columns(data[CLUSTER_FEATURES], CLUSTER_FEATURES)
+    embedding = assignments[['Expense Dimension 1', 'Expense Dimension 2']].to_numpy()
+    results = {}
+    for k, inertia in zip(scores['k'], scores['Inertia']):
+        labels = assignments[f"k={k}"].to_numpy()
+        results[int(k)] = ClusterResult(labels=labels, embedding=embedding,
+                                        profiles=features.groupby(labels).mean(), inertia=float(inertia))
+    return SweepResult(
+        results=results,
+        scores=scores,
+        recommended_k=int(scores.loc[scores['Silhouette'].idxmax(), 'k']),
+        elbow_k=_elbow(scores['k'], scores['Inertia']),
+    )
+
+
+def cached_sweep(data, dataset_key, large=False):
+    mode = 'large' if large else 'full'
+
+    def compute():
+        # A sweep precomputed by analytics.py for this dataset and mode is loaded instead of refitted
+        frames = load_results(dataset_key, 'clustering')
+        if frames is not None and bool(frames['mode']['large'].iloc[0]) == large:
+            return sweep_from_frames(data, frames)
+        prepared = _cache.get_or_compute(f"{dataset_key}:{mode}:features",
+                                         lambda: prepare_features(data, large=large))
+        return cluster_sweep(*prepared, large=large)
+
+    sweep = _cache.get_or_compute(f"{dataset_key}:{mode}:sweep", compute)
+    # Seed the per-k cache so any k in the sweep is served without refitting
+    for k, result in sweep.results.items():
+        if f"{dataset_key}:{mode}:k={k}" not in _cache:
+            _cache.put(f"{dataset_key}:{mode}:k={k}", result)
+    return sweep
+
+
+def cached_clusters(data, dataset_key, n_clusters, large=False):
+    mode = 'large' if large else 'full'
+    prepared = _cache.get_or_compute(f"{dataset_key}:{mode}:features",
+                                     lambda: prepare_features(data, large=large))
+    return _cache.get_or_compute(f"{dataset_key}:{mode}:k={n_clusters}",
+                                 lambda: fit_clusters(*prepared, n_clusters, large=large))
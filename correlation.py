@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from model_cache import ModelCache
+from profiling import profiled
+from results_store import load_results
+
+CORRELATION_COLUMNS = ['Monthly Income (£)', 'Water Bill (£)', 'Electricity Bill (£)', 'Gas Bill (£)', 'Groceries (£)',
+                       'Transportation (£)', 'Sky Sports (£)', 'Other Expenses (£)', 'Savings for Property (£)',
+                       'Monthly Outing (£)', 'Netflix (£)', 'Amazon Prime (£)']
+METHODS = ('pearson', 'spearman', 'kendall')
+
+# Full matrices per dataset and method; selections are slices of these
+_cache = ModelCache(max_entries=32)
+
+
+class CoMoments:
+    # Running pairwise sums for Pearson correlation. Every statistic is a plain sum over rows,
+    # so chunks can be added one at a time and files larger than memory streamed through.
+    # Like DataFrame.corr(), each pair only uses the rows where both values are present.
+    def __init__(self, n_columns):
+        self.shift = None
+        self.n = np.zeros((n_columns, n_columns))
+        self.sums = np.zeros((n_columns, n_columns))
+        self.cross = np.zeros((n_columns, n_columns))
+        self.squares = np.zeros((n_columns, n_columns))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        if self.shift is None:
+            # Shifting by an early estimate of the means keeps the sums well conditioned
+            self.shift = np.nan_to_num(np.nanmean(values, axis=0)) if present.any() else np.zeros(values.shape[1])
+        centred = np.where(present, values - self.shift, 0.0)
+        mask = present.astype(np.float64)
+        self.n += mask.T @ mask
+        self.sums += centred.T @ mask
+        self.cross += centred.T @ centred
+        self.squares += (centred ** 2).T @ mask
+        return self
+
+    def correlation(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = self.n * self.cross - self.sums * self.sums.T
+            variance = (self.n * self.squares - self.sums ** 2) * (self.n * self.squares.T - self.sums.T ** 2)
+            matrix = covariance / np.sqrt(variance)
+        return np.clip(matrix, -1.0, 1.0)
+
+
+@profiled('correlation_matrix')
+def correlation_matrix(data, columns=CORRELATION_COLUMNS, method='pearson'):
+    columns = [column for column in columns if column in data.columns]
+    if method == 'kendall':
+        # Kendall's tau is pairwise over rows and has no co-moment form
+        return data[columns].astype(np.float64).corr(method='kendall')
+    if method not in ('pearson', 'spearman'):
+        raise ValueError(f"Unknown correlation method '{method}', expected one of {METHODS}")
+    values = data[columns].to_numpy(dtype=np.float64)
+    if method == 'spearman':
+        matrix = _spearman(values)
+    else:
+        matrix = CoMoments(len(columns)).update(values).correlation()
+    return pd.DataFrame(matrix, index=columns, columns=columns)
+
+
+def _rank(values):
+    # Average ranks per column, NaN staying NaN, as DataFrame.rank()
+    return pd.DataFrame(values).rank().to_numpy()
+
+
+def _spearman(values):
+    # Pearson over ranks. Like DataFrame.corr(method='spearman'), each pair is ranked within the
+    # rows where both values are present; that only differs from ranking whole columns for
+    # pairs whose columns are missing in different rows, so just those are re-ranked.
+    matrix = CoMoments(values.shape[1]).update(_rank(values)).correlation()
+    present = ~np.isnan(values)
+    for i in range(values.shape[1]):
+        for j in range(i + 1, values.shape[1]):
+            if np.array_equal(present[:, i], present[:, j]):
+                continue
+            rows = present[:, i] & present[:, j]
+            ranks = _rank(values[rows][:, [i, j]])
+            matrix[i, j] = matrix[j, i] = CoMoments(2).update(ranks).correlation()[0, 1]
+    return matrix
+
+
+def correlation_from_csv(path, columns=CORRELATION_COLUMNS, chunksize=100_000):
+    # Pearson matrix of a CSV streamed in chunks; memory is bounded by one chunk
+    moments = CoMoments(len(columns))
+    for chunk in pd.read_csv(path, usecols=columns, dtype={column: 'float32' for column in columns},
+                             chunksize=chunksize):
+        moments.update(chunk[columns].to_numpy(dtype=np.float64))
+    return pd.DataFrame(moments.correlation(), index=columns, columns=columns)
+
+
+def cached_correlation(data, dataset_key, method='pearson'):
+    def compute():
+        frames = load_results(dataset_key, 'correlation')
+        if frames is not None and method in frames:
+            return frames[method]
+        return correlation_matrix(data, method=method)
+
+    return _cache.get_or_compute(f"{dataset_key}:{method}", compute)
@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ingestion import EMPLOYEE_COLUMN, EXPENSE_COLUMNS, INCOME_COLUMN, SAVINGS_COLUMN
+from profiling import profile_stage
+
+
+class EmployeeIndex:
+    # Built once per upload: rows grouped by employee so a lookup is a slice of a position
+    # array (O(k) in the employee's rows) instead of a boolean scan over the whole frame,
+    # plus the per-row totals the pages used to recompute on every interaction.
+    def __init__(self, data):
+        self.data = data
+        codes, uniques = pd.factorize(data[EMPLOYEE_COLUMN], sort=False)
+        valid = codes >= 0
+        self._order = np.flatnonzero(valid)[np.argsort(codes[valid], kind='stable')]
+        counts = np.bincount(codes[valid], minlength=len(uniques))
+        self._stops = np.cumsum(counts)
+        self._starts = self._stops - counts
+        # First-appearance order, same as data['Employee'].unique()
+        self.employees = np.asarray(uniques)
+        self._positions = {employee: i for i, employee in enumerate(self.employees)}
+
+        expense_columns = [column for column in EXPENSE_COLUMNS if column in data.columns]
+        totals = pd.DataFrame({
+            EMPLOYEE_COLUMN: data[EMPLOYEE_COLUMN],
+            INCOME_COLUMN: data[INCOME_COLUMN],
+            'Total Expenses': data[expense_columns].sum(axis=1),
+            'Savings': data[SAVINGS_COLUMN],
+        })
+        totals['Savings Percentage'] = totals['Savings'] / totals[INCOME_COLUMN] * 100
+        self.totals = totals
+
+    def __contains__(self, employee):
+        return employee in self._positions
+
+    def __len__(self):
+        return len(self.employees)
+
+    def _row_positions(self, employees):
+        slices = [self._order[self._starts[i]:self._stops[i]]
+                  for i in (self._positions[employee] for employee in employees if employee in self._positions)]
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.intp)
+
+    def rows(self, employee):
+        return self.data.iloc[self._row_positions([employee])]
+
+    def rows_for(self, employees):
+        # Keeps the original row order so charts look the same as with a boolean filter
+        return self.data.iloc[np.sort(self._row_positions(employees))]
+
+    def totals_for(self, employees):
+        return self.totals.iloc[np.sort(self._row_positions(employees))]
+
+
+def category_totals(data):
+    # Each employee's summed spending per expense category
+    columns = [column for column in EXPENSE_COLUMNS if column in data.columns]
+    return data.groupby(EMPLOYEE_COLUMN, sort=False, observed=True)[columns].sum()
+
+
+_MAX_INDEXES = 8
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def dataset_key(session_state):
+    # The dataset digest when the upload went through the dataset store, so sessions looking at
+    # the same file share cached results; otherwise the identity of the session's frame
+    return session_state.get('dataset_digest') or id(session_state['uploaded_data'])
+
+
+def get_employee_index(session_state):
+    data = session_state['uploaded_data']
+    key = dataset_key(session_state)
+    index = session_state.get('employee_index')
+    if index is not None and session_state.get('employee_index_key') == key:
+        return index
+
+    with _lock:
+        index = _indexes.get(key)
+        if index is None or (key == id(data) and index.data is not data):
+            with profile_stage('employee_index_build'):
+                index = EmployeeIndex(data)
+            _indexes[key] = index
+            while len(_indexes) > _MAX_INDEXES:
+                _indexes.popitem(last=False)
+        _indexes.move_to_end(key)
+
+    session_state['employee_index'] = index
+    session_state['employee_index_key'] = key
+    return index
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pyarrow.feather as feather
+
+from imputation import DEFAULT_STRATEGIES
+from ingestion import PIPELINE_VERSION, SCHEMA
+
+# Cleaned datasets are stored once per distinct upload as uncompressed Feather (Arrow IPC)
+# files, so they can be memory-mapped instead of parsed again.
+STORE_DIR = os.environ.get('DATASET_STORE_DIR', '.dataset_store')
+
+_MAX_SHARED_FRAMES = 8
+_shared_frames = OrderedDict()
+_lock = threading.Lock()
+
+
+def pipeline_key():
+    # Everything besides the raw bytes that decides what the cleaned frame contains, so frames
+    # cleaned by an older schema or imputation are never served for the current pipeline
+    return json.dumps({'version': PIPELINE_VERSION, 'schema': SCHEMA, 'imputation': DEFAULT_STRATEGIES},
+                      sort_keys=True)
+
+
+def content_digest(source, block_size=1 << 20):
+    digest = hashlib.sha256(pipeline_key().encode())
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+    elif hasattr(source, 'getbuffer'):
+        digest.update(source.getbuffer())
+    else:
+        for block in iter(lambda: source.read(block_size), b''):
+            digest.update(block)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+def _path(digest):
+    return os.path.join(STORE_DIR, f"{digest}.feather")
+
+
+def contains(digest):
+    return digest in _shared_frames or os.path.exists(_path(digest))
+
+
+def store_frame(frame, digest):
+    os.makedirs(STORE_DIR, exist_ok=True)
+    path = _path(digest)
+    # Write then rename so concurrent sessions never map a half-written file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    feather.write_feather(frame.reset_index(drop=True), tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def load_frame(digest):
+    # Every caller gets a shallow view of one memory-mapped frame per digest. The Arrow-backed
+    # arrays are read-only, and new columns a page adds stay on that session's view.
+    with _lock:
+        if digest not in _shared_frames:
+            table = feather.read_table(_path(digest), memory_map=True)
+            _shared_frames[digest] = table.to_pandas(split_blocks=True)
+            # Sessions still holding an evicted frame keep their view; it is only dropped here
+            while len(_shared_frames) > _MAX_SHARED_FRAMES:
+                _shared_frames.popitem(last=False)
+        _shared_frames.move_to_end(digest)
+        return _shared_frames[digest].copy(deep=False)
+
+
+def load_or_ingest(source, ingest):
+    # ingest(source) -> (frame, report); only called the first time this content is seen
+    digest = content_digest(source)
+    report = None
+    if not contains(digest):
+        frame, report = ingest(source)
+        store_frame(frame, digest)
+    return digest, load_frame(digest), report
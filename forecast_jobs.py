@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from forecasting import MODELS, FitCancelled, cached_forecast, history_key
+
+# 'thread' shares the in-process model cache; 'process' isolates the fits from the Streamlit server
+EXECUTOR = os.environ.get('FORECAST_EXECUTOR', 'thread')
+MAX_WORKERS = int(os.environ.get('FORECAST_WORKERS', 3))
+# Finished jobs are forgotten this many seconds after their last model completed
+JOB_TTL = float(os.environ.get('FORECAST_JOB_TTL', 3600))
+
+
+def _forecast_only(model_name, df, stop_event):
+    # Only the forecast crosses the executor boundary; fitted Keras models don't pickle
+    _, forecast = cached_forecast(model_name, df, should_stop=stop_event.is_set)
+    return forecast
+
+
+class ForecastJob:
+    def __init__(self, inputs_key, futures, stop_event):
+        self.id = uuid.uuid4().hex
+        self.inputs_key = inputs_key
+        self.futures = futures
+        self.stop_event = stop_event
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.cancelled = False
+        for future in futures.values():
+            future.add_done_callback(self._future_done)
+
+    def _future_done(self, future):
+        if self.done():
+            self.finished_at = time.time()
+
+    def status(self, model_name):
+        future = self.futures[model_name]
+        if future.cancelled() or (self.cancelled and not future.done()):
+            return 'cancelled'
+        if future.done():
+            error = future.exception()
+            if isinstance(error, FitCancelled):
+                return 'cancelled'
+            return 'failed' if error is not None else 'done'
+        return 'running' if future.running() else 'queued'
+
+    def result(self, model_name):
+        # The forecast once that model has finished, otherwise None
+        if self.status(model_name) != 'done':
+            return None
+        return self.futures[model_name].result()
+
+    def error(self, model_name):
+        return self.futures[model_name].exception() if self.status(model_name) == 'failed' else None
+
+    def progress(self):
+        finished = sum(future.done() for future in self.futures.values())
+        return finished / len(self.futures)
+
+    def done(self):
+        return all(future.done() for future in self.futures.values())
+
+    def cancel(self):
+        # Queued fits are dropped. Running fits see the stop event at their next check (before
+        # fitting, and after every LSTM epoch), raise FitCancelled and free their worker.
+        self.cancelled = True
+        self.stop_event.set()
+        for future in self.futures.values():
+            future.cancel()
+
+
+class ForecastJobManager:
+    def __init__(self, executor=EXECUTOR, max_workers=MAX_WORKERS):
+        if executor == 'process':
+            context = multiprocessing.get_context('spawn')
+            self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+            # Worker processes can only see a stop event owned by a manager process
+            self._manager = context.Manager()
+            self._new_event = self._manager.Event
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='forecast')
+            self._new_event = threading.Event
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        # Sessions that have gone away leave their finished jobs behind
+        expired = [owner for owner, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > JOB_TTL]
+        for owner in expired:
+            del self._jobs[owner]
+
+    def submit(self, owner, df, models=None):
+        # One live job per owner (browser session). Reruns with the same inputs get the existing
+        # job back; changed inputs cancel the superseded job and start a new one.
+        models = models or list(MODELS)
+        # Values and models only: the history's dates are regenerated on every rerun
+        inputs_key = history_key(df, models=models)
+        with self._lock:
+            self._prune(time.time())
+            current = self._jobs.get(owner)
+            if current is not None and current.inputs_key == inputs_key and not current.cancelled:
+                return current
+            if current is not None:
+                current.cancel()
+            stop_event = self._new_event()
+            futures = {name: self._executor.submit(_forecast_only, name, df, stop_event) for name in models}
+            job = ForecastJob(inputs_key, futures, stop_event)
+            self._jobs[owner] = job
+            return job
+
+    def job(self, owner):
+        return self._jobs.get(owner)
+
+    def cancel(self, owner):
+        with self._lock:
+            job = self._jobs.pop(owner, None)
+        if job is not None:
+            job.cancel()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    # Shared by every session in the Streamlit server process and kept across reruns
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ForecastJobManager()
+        return _manager
@@ -0,0 +1,172 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import pandas as pd
+
+from model_backends import get_backend
+from model_cache import fingerprint, get_model_cache
+from profiling import profiled
+
+ARIMA_PARAMS = {'order': (1, 1, 1), 'steps': 6}
+LSTM_PARAMS = {'window': 6, 'units': 50, 'epochs': 50, 'steps': 6}
+PROPHET_PARAMS = {'periods': 2, 'freq': 'ME', 'steps': 6}
+# Flat months at the start of every history, followed by one month per input change
+BASE_MONTHS = 5
+INPUT_MONTHS = 5
+
+
+class FitCancelled(Exception):
+    # Raised by a fit whose should_stop() callback returned True; nothing is cached for it
+    pass
+
+
+def _raise_if_stopped(should_stop):
+    if should_stop is not None and should_stop():
+        raise FitCancelled()
+
+
+def history_dates(months):
+    # Consecutive month ends starting next month; midnight dates, so the index only changes
+    # when the month does
+    next_month_start = (pd.Timestamp.today().normalize() + pd.DateOffset(months=1)).replace(day=1)
+    return pd.date_range(start=next_month_start, periods=months, freq='ME', name='ds')
+
+
+def build_histories(current_savings, current_expenses, changes, base_months=BASE_MONTHS):
+    # (employees, months, 2) savings/expenses array: base_months flat months followed by the
+    # running total of each month's change against the month-1 values
+    current = np.stack([np.asarray(current_savings, dtype=np.float64),
+                        np.asarray(current_expenses, dtype=np.float64)], axis=-1).reshape(-1, 2)
+    changes = np.asarray(changes, dtype=np.float64).reshape(len(current), -1, 2)
+    histories = np.empty((len(current), base_months + changes.shape[1], 2))
+    histories[:, :base_months] = current[:, None]
+    histories[:, base_months:] = current[:, None] + np.cumsum(changes - current[:, None], axis=1)
+    return histories
+
+
+def build_history(current_savings, current_expenses, changes, base_months=BASE_MONTHS):
+    history = build_histories(current_savings, current_expenses, [changes], base_months=base_months)[0]
+    return pd.DataFrame(history, index=history_dates(len(history)), columns=['savings', 'expenses'])
+
+
+def employee_baseline(employee_data):
+    # Month 1 savings and expenses for one employee's rows
+    current_savings = employee_data['Savings for Property (£)'].iloc[0]
+    current_expenses = employee_data['Monthly Income (£)'].iloc[0] - current_savings
+    return float(current_savings), float(current_expenses)
+
+
+def forecast_dates(steps=6):
+    # Forecast dates start five months from today, matching the page's plot
+    return pd.date_range(start=pd.Timestamp.today().normalize() + pd.DateOffset(months=5), periods=steps, freq='ME')
+
+
+@profiled('arima_fit')
+def fit_arima(df, order=(1, 1, 1), steps=6, should_stop=None):
+    _raise_if_stopped(should_stop)
+    ARIMA = get_backend('arima')
+    arima_model = ARIMA(df['savings'], order=order)
+    arima_results = arima_model.fit()
+    arima_forecast = arima_results.forecast(steps=steps)
+    return arima_results, arima_forecast.values.tolist()
+
+
+def scale_histories(histories):
+    # Per-employee min-max scaling of an (employees, months, features) array, as MinMaxScaler does per fit
+    mins = histories.min(axis=1, keepdims=True)
+    ranges = histories.max(axis=1, keepdims=True) - mins
+    ranges[ranges == 0] = 1.0
+    return (histories - mins) / ranges, mins, ranges
+
+
+def make_windows(scaled, window):
+    # Strided (employees, samples, window, features) view over the scaled series; no data is copied
+    X = sliding_window_view(scaled[:, :-1], window, axis=1).transpose(0, 1, 3, 2)
+    y = scaled[:, window:]
+    return X, y
+
+
+def lstm_forecast(model, last_windows, steps):
+    # One batched forward pass per horizon step for every employee's window at once
+    forecasts = np.empty((last_windows.shape[0], steps, last_windows.shape[2]))
+    windows = np.array(last_windows, dtype=np.float32)
+    for step in range(steps):
+        next_month = model.predict_on_batch(windows)
+        forecasts[:, step] = next_month
+        windows = np.concatenate((windows[:, 1:], next_month[:, None, :]), axis=1)
+    return forecasts
+
+
+@profiled('lstm_fit')
+def fit_lstm_batch(histories, window=6, units=50, epochs=50, steps=6, should_stop=None):
+    # Fits one LSTM over the pooled windows of every employee and returns savings forecasts per employee
+    n_employees, months, n_features = histories.shape
+    if months <= window:
+        # Training needs at least one window followed by a target month
+        raise ValueError(f"LSTM needs a history of at least {window + 1} months, got {months}")
+    _raise_if_stopped(should_stop)
+    scaled, mins, ranges = scale_histories(np.asarray(histories, dtype=np.float64))
+    X, y = make_windows(scaled, window)
+    keras = get_backend('keras')
+    model = keras.Sequential([
+        keras.LSTM(units, activation='relu', input_shape=(window, n_features)),
+        keras.Dense(n_features)
+    ])
+    model.compile(optimizer='adam', loss='mse')
+    callbacks = []
+    if should_stop is not None:
+        # Polled after every epoch, so a superseded fit frees its worker within one epoch
+        def stop_if_cancelled(epoch, logs):
+            if should_stop():
+                model.stop_training = True
+        callbacks.append(keras.LambdaCallback(on_epoch_end=stop_if_cancelled))
+    model.fit(X.reshape(-1, window, n_features), y.reshape(-1, n_features), epochs=epochs, verbose=0,
+              callbacks=callbacks)
+    # A model stopped early is undertrained and must not be returned or cached
+    _raise_if_stopped(should_stop)
+    forecasts = lstm_forecast(model, scaled[:, -window:], steps)
+    forecasts = forecasts * ranges + mins
+    return model, forecasts[:, :, 0]
+
+
+def fit_lstm(df, window=6, units=50, epochs=50, steps=6, should_stop=None):
+    histories = df[['savings', 'expenses']].to_numpy()[None]
+    model, forecasts = fit_lstm_batch(histories, window=window, units=units, epochs=epochs, steps=steps,
+                                      should_stop=should_stop)
+    return model, forecasts[0].tolist()
+
+
+@profiled('prophet_fit')
+def fit_prophet(df, periods=2, freq='ME', steps=6, should_stop=None):
+    _raise_if_stopped(should_stop)
+    prophet_df = df['savings'].rename('y').reset_index()
+    Prophet = get_backend('prophet')
+    m = Prophet()
+    m.fit(prophet_df)
+    future = m.make_future_dataframe(periods=periods, freq=freq)
+    forecast_prophet = m.predict(future)
+    return m, forecast_prophet['yhat'].tail(steps).values.tolist()
+
+
+MODELS = {
+    'ARIMA': (fit_arima, ARIMA_PARAMS),
+    'LSTM': (fit_lstm, LSTM_PARAMS),
+    'Prophet': (fit_prophet, PROPHET_PARAMS),
+}
+
+
+def history_key(df, **params):
+    # Cache key of a history: its monthly values and hyperparameters. The month-end dates are
+    # generated from the current time, so only the month the history starts in is part of it.
+    start = df.index[0].strftime('%Y-%m') if isinstance(df.index, pd.DatetimeIndex) and len(df) else None
+    return fingerprint(df.reset_index(drop=True), start=start, **params)
+
+
+def cached_forecast(model_name, df, cache=None, should_stop=None, **params):
+    # Returns (fitted_model, forecast); identical inputs and hyperparameters never retrain.
+    # should_stop() is checked before the fit (and by the LSTM after every epoch); when it
+    # returns True the fit raises FitCancelled.
+    fit, defaults = MODELS[model_name]
+    params = {**defaults, **params}
+    cache = cache if cache is not None else get_model_cache()
+    key = history_key(df, model=model_name, **params)
+    return cache.get_or_compute(key, lambda: fit(df, should_stop=should_stop, **params))
@@ -0,0 +1,113 @@
+import json
+import os
+from collections import defaultdict
+
+import numpy as np
+
+STRATEGIES = ('mean', 'zero', 'employee_median')
+# A median has no running sufficient statistic, so employee_median keeps each employee's observed
+# values; only the most recent ones are kept (ten years of monthly rows), which bounds the state
+MAX_EMPLOYEE_VALUES = 120
+
+# The fills FIllColumns.py has always applied
+DEFAULT_STRATEGIES = {
+    'Water Bill (£)': 'mean',
+    'Monthly Outing (£)': 'mean',
+    'Sky Sports (£)': 'zero',
+    'Other Expenses (£)': 'zero',
+    'Savings for Property (£)': 'zero',
+}
+
+
+class Imputer:
+    # Per-column fills backed by running statistics, so each new batch of monthly rows updates
+    # the fill values without rescanning the rows seen before.
+    def __init__(self, strategies=None, employee_column='Employee'):
+        self.employee_column = employee_column
+        self.strategies = dict(DEFAULT_STRATEGIES if strategies is None else strategies)
+        unknown = {strategy for strategy in self.strategies.values() if strategy not in STRATEGIES}
+        if unknown:
+            raise ValueError(f"Unknown imputation strategies {sorted(unknown)}, expected one of {STRATEGIES}")
+        self.counts = defaultdict(int)
+        self.sums = defaultdict(float)
+        # employee -> most recent observed values, per employee_median column
+        self.employee_values = defaultdict(lambda: defaultdict(list))
+
+    def partial_fit(self, frame):
+        for column, strategy in self.strategies.items():
+            if column not in frame.columns:
+                continue
+            values = frame[column]
+            self.counts[column] += int(values.count())
+            self.sums[column] += float(values.sum())
+            if strategy == 'employee_median' and self.employee_column in frame.columns:
+                observed = frame.loc[values.notna(), [self.employee_column, column]]
+                for employee, employee_values in observed.groupby(self.employee_column, observed=True)[column]:
+                    kept = self.employee_values[column][str(employee)]
+                    kept.extend(employee_values.astype(float).tolist())
+                    del kept[:-MAX_EMPLOYEE_VALUES]
+        return self
+
+    def mean(self, column):
+        return self.sums[column] / self.counts[column] if self.counts[column] else np.nan
+
+    def employee_medians(self, column):
+        return {employee: float(np.median(values)) for employee, values in self.employee_values[column].items()}
+
+    def transform(self, frame, only=None):
+        # Returns a filled copy; `only` restricts the pass to some strategies (e.g. {'zero'} per chunk)
+        filled = frame.copy(deep=False)
+        for column, strategy in self.strategies.items():
+            if column not in filled.columns or (only is not None and strategy not in only):
+                continue
+            if strategy == 'zero':
+                filled[column] = filled[column].fillna(0)
+                continue
+            if strategy == 'employee_median' and self.employee_column in filled.columns:
+                medians = filled[self.employee_column].astype(str).map(self.employee_medians(column))
+                filled[column] = filled[column].fillna(medians.astype(filled[column].dtype))
+            # Employees with no observed value fall back to the column mean
+            filled[column] = filled[column].fillna(self.mean(column))
+        return filled
+
+    def fit_transform(self, frame):
+        return self.partial_fit(frame).transform(frame)
+
+    def to_dict(self):
+        return {
+            'strategies': self.strategies,
+            'employee_column': self.employee_column,
+            'counts': dict(self.counts),
+            'sums': dict(self.sums),
+            'employee_values': {column: dict(values) for column, values in self.employee_values.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        imputer = cls(state['strategies'], state['employee_column'])
+        imputer.counts.update(state['counts'])
+        imputer.sums.update(state['sums'])
+        for column, values in state['employee_values'].items():
+            imputer.employee_values[column].update(values)
+        return imputer
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path, strategies=None):
+        if not os.path.exists(path):
+            return cls(strategies)
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def impute(frame, strategies=None):
+    # One-shot fill of a frame already in memory, for pages that need gap-free columns
+    return Imputer(strategies).fit_transform(frame)
+
+
+def impute_columns(frame, columns, strategy='mean'):
+    return impute(frame, {column: strategy for column in columns})
+
@@ -0,0 +1,131 @@
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from imputation import Imputer
+from profiling import profiled, traced_peak
+
+EMPLOYEE_COLUMN = 'Employee'
+INCOME_COLUMN = 'Monthly Income (£)'
+SAVINGS_COLUMN = 'Savings for Property (£)'
+EXPENSE_COLUMNS = ['Electricity Bill (£)', 'Gas Bill (£)', 'Netflix (£)', 'Amazon Prime (£)', 'Groceries (£)',
+                   'Transportation (£)', 'Water Bill (£)', 'Sky Sports (£)', 'Other Expenses (£)',
+                   'Monthly Outing (£)']
+MONEY_COLUMNS = [INCOME_COLUMN] + EXPENSE_COLUMNS + [SAVINGS_COLUMN]
+
+# Employee names repeat across monthly rows, so they are stored once as categories
+SCHEMA = {EMPLOYEE_COLUMN: 'category', **{column: 'float32' for column in MONEY_COLUMNS}}
+# Money columns are read without a dtype and coerced per chunk, so one malformed cell becomes a
+# missing value instead of failing the whole upload
+READ_DTYPES = {EMPLOYEE_COLUMN: 'category'}
+REQUIRED_COLUMNS = [EMPLOYEE_COLUMN, INCOME_COLUMN, SAVINGS_COLUMN]
+# Part of every dataset store digest; bump it whenever validation or imputation code changes what
+# a cleaned frame contains (schema and default fill strategies are included automatically)
+PIPELINE_VERSION = 1
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+@dataclass
+class IngestReport:
+    rows: int = 0
+    chunks: int = 0
+    dropped_rows: int = 0
+    coerced_cells: int = 0
+    frame_bytes: int = 0
+    peak_bytes: int = None
+
+    def summary(self):
+        summary = (f"{self.rows:,} rows in {self.chunks} chunks, {self.dropped_rows:,} invalid rows dropped, "
+                   f"{self.coerced_cells:,} unreadable amounts treated as missing, "
+                   f"{self.frame_bytes / 1e6:.1f} MB in memory")
+        if self.peak_bytes is not None:
+            summary += f", {self.peak_bytes / 1e6:.1f} MB peak while loading"
+        return summary
+
+
+def coerce_money(chunk):
+    # Money columns as float32; returns (chunk, number of non-empty cells that weren't numbers)
+    chunk = chunk.copy(deep=False)
+    coerced = 0
+    for column in MONEY_COLUMNS:
+        if column not in chunk.columns:
+            continue
+        values = chunk[column]
+        if not pd.api.types.is_numeric_dtype(values):
+            numbers = pd.to_numeric(values, errors='coerce')
+            coerced += int((numbers.isna() & values.notna()).sum())
+            values = numbers
+        chunk[column] = values.astype(SCHEMA[column])
+    return chunk, coerced
+
+
+def validate_chunk(chunk):
+    missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    # Rows without an employee or an income cannot be attributed or analysed
+    return chunk.dropna(subset=[EMPLOYEE_COLUMN, INCOME_COLUMN])
+
+
+def _concat_chunks(chunks):
+    # Concatenating categoricals with different categories would fall back to object dtype
+    employees = union_categoricals([chunk[EMPLOYEE_COLUMN] for chunk in chunks])
+    frame = pd.concat([chunk.drop(columns=EMPLOYEE_COLUMN) for chunk in chunks], ignore_index=True)
+    frame.insert(0, EMPLOYEE_COLUMN, employees)
+    return frame
+
+
+def _ingest_chunks(chunks, imputer, report):
+    # Coerces, validates and imputes raw chunks into one frame, counting into report
+    imputer = imputer if imputer is not None else Imputer()
+    cleaned = []
+    for chunk in chunks:
+        report.chunks += 1
+        chunk, coerced = coerce_money(chunk)
+        report.coerced_cells += coerced
+        valid = validate_chunk(chunk)
+        report.dropped_rows += len(chunk) - len(valid)
+        # Zero fills need no statistics; the others are filled once every chunk has been seen
+        imputer.partial_fit(valid)
+        cleaned.append(imputer.transform(valid, only={'zero'}))
+
+    if not cleaned:
+        raise ValueError("The uploaded file contains no rows.")
+    data = _concat_chunks(cleaned)
+    del cleaned
+    data = imputer.transform(data)
+    report.rows = len(data)
+    report.frame_bytes = int(data.memory_usage(deep=True).sum())
+    return data
+
+
+@profiled('read_csv')
+def read_finance_csv(source, chunksize=DEFAULT_CHUNKSIZE, track_memory=False, imputer=None):
+    # Streams the CSV in chunks with a compact dtype schema; returns (frame, IngestReport).
+    # track_memory reports the peak allocation, at the cost of a much slower read under tracemalloc.
+    # Pass a previously fitted Imputer to fill a new batch using the statistics of earlier ones.
+    report = IngestReport()
+    with traced_peak() if track_memory else nullcontext() as memory:
+        data = _ingest_chunks(pd.read_csv(source, chunksize=chunksize, dtype=READ_DTYPES), imputer, report)
+    if track_memory:
+        report.peak_bytes = memory['peak_bytes']
+    return data, report
+
+
+@profiled('read_parquet')
+def read_finance_parquet(source, chunksize=DEFAULT_CHUNKSIZE, track_memory=False, imputer=None):
+    # Same validation, schema and imputation as read_finance_csv for an exported Parquet file
+    report = IngestReport()
+    with traced_peak() if track_memory else nullcontext() as memory:
+        raw = pd.read_parquet(source)
+        if EMPLOYEE_COLUMN in raw.columns:
+            raw[EMPLOYEE_COLUMN] = raw[EMPLOYEE_COLUMN].astype('category')
+        chunks = (raw.iloc[start:start + chunksize] for start in range(0, len(raw), chunksize))
+        data = _ingest_chunks(chunks, imputer, report)
+        del raw
+    if track_memory:
+        report.peak_bytes = memory['peak_bytes']
+    return data, report
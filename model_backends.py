@@ -0,0 +1,47 @@
+import importlib
+import threading
+from types import SimpleNamespace
+
+# Heavy model libraries are imported on first use only, so pages that never
+# forecast (and reruns of pages that do) don't pay TensorFlow/Prophet start-up cost.
+_loaders = {}
+_loaded = {}
+_lock = threading.Lock()
+
+
+def register_backend(name, loader):
+    _loaders[name] = loader
+
+
+def get_backend(name):
+    if name not in _loaders:
+        raise KeyError(f"Unknown model backend '{name}', expected one of {sorted(_loaders)}")
+    with _lock:
+        if name not in _loaded:
+            _loaded[name] = _loaders[name]()
+        return _loaded[name]
+
+
+def is_loaded(name):
+    return name in _loaded
+
+
+def _load_arima():
+    return importlib.import_module('statsmodels.tsa.arima.model').ARIMA
+
+
+def _load_keras():
+    models = importlib.import_module('tensorflow.python.keras.models')
+    layers = importlib.import_module('tensorflow.python.keras.layers')
+    callbacks = importlib.import_module('tensorflow.python.keras.callbacks')
+    return SimpleNamespace(Sequential=models.Sequential, LSTM=layers.LSTM, Dense=layers.Dense,
+                           LambdaCallback=callbacks.LambdaCallback)
+
+
+def _load_prophet():
+    return importlib.import_module('prophet').Prophet
+
+
+register_backend('arima', _load_arima)
+register_backend('keras', _load_keras)
+register_backend('prophet', _load_prophet)
@@ -0,0 +1,120 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def fingerprint(frame, **params):
+    # Content hash of the frame (values + index) plus the model hyperparameters
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+    digest.update(json.dumps(list(frame.columns), default=str).encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class ModelCache:
+    def __init__(self, max_entries=64, cache_dir=None, max_disk_entries=256):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        if self.cache_dir is not None and os.path.exists(self._disk_path(key)):
+            try:
+                with open(self._disk_path(key), 'rb') as f:
+                    value = pickle.load(f)
+                # The file's mtime is its recency for disk eviction
+                os.utime(self._disk_path(key))
+            except (OSError, pickle.UnpicklingError, EOFError):
+                return None
+            self._store(key, value)
+            return value
+        return None
+
+    def put(self, key, value):
+        self._store(key, value)
+        if self.cache_dir is not None:
+            try:
+                with open(self._disk_path(key), 'wb') as f:
+                    pickle.dump(value, f)
+            except (OSError, pickle.PicklingError, TypeError, AttributeError):
+                # Some fitted models (e.g. Keras) cannot be pickled; keep them in memory only
+                if os.path.exists(self._disk_path(key)):
+                    os.remove(self._disk_path(key))
+            self._evict_disk()
+
+    def _evict_disk(self):
+        # Least recently used pickles beyond max_disk_entries are deleted
+        paths = glob.glob(os.path.join(self.cache_dir, '*.pkl'))
+        if len(paths) <= self.max_disk_entries:
+            return
+        recency = {}
+        for path in paths:
+            try:
+                recency[path] = os.path.getmtime(path)
+            except OSError:
+                pass
+        for path in sorted(recency, key=recency.get)[:len(recency) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_default_cache = None
+
+
+def get_model_cache():
+    # Module-level cache survives Streamlit reruns because imported modules stay in sys.modules
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ModelCache(
+            max_entries=int(os.environ.get('MODEL_CACHE_SIZE', 64)),
+            cache_dir=os.environ.get('MODEL_CACHE_DIR'),
+            max_disk_entries=int(os.environ.get('MODEL_CACHE_DISK_SIZE', 256)),
+        )
+    return _default_cache
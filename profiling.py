@@ -0,0 +1,181 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger('finance.profiling')
+
+# Allocation tracing slows allocation-heavy code, so it is on only when asked for:
+# PROFILE_MEMORY=1, or while the debug panel is open in the app
+TRACE_MEMORY = os.environ.get('PROFILE_MEMORY') == '1'
+# Optional JSON-lines file every stage record is appended to, for shipping to monitoring
+PROFILE_LOG_PATH = os.environ.get('PROFILE_LOG_PATH')
+
+# Streamlit runs each session's script in its own thread, so records are kept per thread. Worker
+# threads (e.g. background forecast jobs) never render a panel, so their history is capped.
+MAX_RECORDS = 500
+_state = threading.local()
+_log_lock = threading.Lock()
+
+# tracemalloc is process-wide, so it is shared by every session: tracing starts with the first
+# traced block and stops after the last one, and resetting the peak for a new block first folds
+# the peak so far into every block still open, in any thread. Peaks therefore also count other
+# threads' allocations while they overlap.
+_trace_lock = threading.Lock()
+_trace_users = 0
+_trace_owned = False
+_open_traces = {}
+if TRACE_MEMORY:
+    # Traced for the life of the process rather than per block
+    tracemalloc.start()
+
+
+def _records():
+    if not hasattr(_state, 'records'):
+        _state.records, _state.stack = deque(maxlen=MAX_RECORDS), []
+    return _state.records
+
+
+def _trace_memory():
+    return TRACE_MEMORY or getattr(_state, 'trace_memory', False)
+
+
+def tracing_memory():
+    # Whether this run asked for allocation tracing (PROFILE_MEMORY=1 or the debug panel)
+    return _trace_memory()
+
+
+def debug_panel_open():
+    return getattr(_state, 'show_panel', False)
+
+
+def _emit(record):
+    logger.info(json.dumps(record))
+    if PROFILE_LOG_PATH:
+        with _log_lock, open(PROFILE_LOG_PATH, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+def _begin_trace():
+    global _trace_users, _trace_owned
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trace_owned = True
+        _trace_users += 1
+        current, peak = tracemalloc.get_traced_memory()
+        for trace in _open_traces.values():
+            trace['peak_seen'] = max(trace['peak_seen'], peak)
+        tracemalloc.reset_peak()
+        trace = {'base': current, 'peak_seen': 0}
+        _open_traces[id(trace)] = trace
+        return trace
+
+
+def _end_trace(trace):
+    # Peak bytes above the block's starting allocation
+    global _trace_users, _trace_owned
+    with _trace_lock:
+        peak = max(trace['peak_seen'], tracemalloc.get_traced_memory()[1])
+        del _open_traces[id(trace)]
+        _trace_users -= 1
+        if _trace_users == 0 and _trace_owned:
+            tracemalloc.stop()
+            _trace_owned = False
+    return max(peak - trace['base'], 0)
+
+
+@contextmanager
+def traced_peak():
+    # {'peak_bytes': ...} once the block exits, tracing allocations for as long as it runs
+    memory = {'peak_bytes': None}
+    trace = _begin_trace()
+    try:
+        yield memory
+    finally:
+        memory['peak_bytes'] = _end_trace(trace)
+
+
+@contextmanager
+def profile_stage(name):
+    # Records wall time, CPU time and (when tracing) peak allocation of the enclosed block
+    records = _records()
+    stack = _state.stack
+    trace = _begin_trace() if _trace_memory() else None
+    stack.append(name)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        record = {
+            'stage': name,
+            'depth': len(stack) - 1,
+            'wall_seconds': round(time.perf_counter() - wall, 6),
+            'cpu_seconds': round(time.process_time() - cpu, 6),
+            'peak_bytes': _end_trace(trace) if trace is not None else None,
+            'timestamp': time.time(),
+        }
+        stack.pop()
+        records.append(record)
+        _emit(record)
+
+
+def profiled(name=None):
+    def decorator(func):
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def stage_records():
+    return list(_records())
+
+
+def _render_panel(st, records):
+    import pandas as pd
+
+    st.sidebar.subheader("Performance")
+    if not records:
+        st.sidebar.write("No stages recorded.")
+        return
+    table = pd.DataFrame(records)
+    table['stage'] = ['  ' * depth + stage for depth, stage in zip(table['depth'], table['stage'])]
+    table['peak MB'] = table['peak_bytes'].astype(float) / 1e6
+    st.sidebar.dataframe(table[['stage', 'wall_seconds', 'cpu_seconds', 'peak MB']].round(3), hide_index=True)
+
+
+@contextmanager
+def page_profiling(page):
+    # Wraps one run of a page: optional sidebar panel listing every stage recorded during the run
+    import streamlit as st
+
+    show_panel = st.sidebar.checkbox("Show performance debug panel", key='performance_debug_panel')
+    _records().clear()
+    _state.trace_memory = _state.show_panel = show_panel
+    try:
+        with profile_stage(page):
+            yield
+    finally:
+        _state.trace_memory = _state.show_panel = False
+        if show_panel:
+            _render_panel(st, stage_records())
+
+
+def profiled_page(page):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with page_profiling(page):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,60 @@
+import glob
+import os
+import shutil
+import threading
+
+import pandas as pd
+
+# Precomputed page results written by analytics.py, one directory per dataset digest and stage:
+#   <RESULTS_DIR>/<digest>/<stage>/<name>.parquet
+RESULTS_DIR = os.environ.get('ANALYTICS_RESULTS_DIR', 'analytics_results')
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def _stage_dir(dataset_key, stage):
+    return os.path.join(RESULTS_DIR, str(dataset_key), stage)
+
+
+def save_results(dataset_key, stage, frames):
+    # A stage's frames are written to a scratch directory that is then renamed into place, so a
+    # page never sees some of a stage's frames without the rest
+    stage_dir = _stage_dir(dataset_key, stage)
+    os.makedirs(os.path.dirname(stage_dir), exist_ok=True)
+    suffix = f"{os.getpid()}.{threading.get_ident()}"
+    tmp_dir, old_dir = f"{stage_dir}.{suffix}.tmp", f"{stage_dir}.{suffix}.old"
+    os.makedirs(tmp_dir)
+    try:
+        for name, frame in frames.items():
+            frame.to_parquet(os.path.join(tmp_dir, f"{name}.parquet"))
+        if os.path.isdir(stage_dir):
+            os.rename(stage_dir, old_dir)
+        os.rename(tmp_dir, stage_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def load_results(dataset_key, stage):
+    # {name: frame} for a stage computed ahead of time, or None. Only digest-keyed datasets
+    # (uploads that went through the dataset store) can have precomputed results.
+    if not isinstance(dataset_key, str):
+        return None
+    stage_dir = _stage_dir(dataset_key, stage)
+    if not os.path.isdir(stage_dir):
+        return None
+    try:
+        paths = sorted(glob.glob(os.path.join(stage_dir, '*.parquet')))
+        version = tuple(os.path.getmtime(path) for path in paths)
+        with _lock:
+            cached = _loaded.get(stage_dir)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        frames = {os.path.splitext(os.path.basename(path))[0]: pd.read_parquet(path) for path in paths}
+    except FileNotFoundError:
+        # Replaced by a new run while being read; the page computes the stage itself this time
+        return None
+    with _lock:
+        _loaded[stage_dir] = (version, frames)
+    return frames
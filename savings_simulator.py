@@ -0,0 +1,115 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from ingestion import EMPLOYEE_COLUMN, INCOME_COLUMN, SAVINGS_COLUMN, read_finance_csv
+
+# Discretionary spend suggested as cuts, as on the decision-making page
+CUT_COLUMNS = ['Sky Sports (£)', 'Netflix (£)', 'Amazon Prime (£)', 'Monthly Outing (£)']
+MONEY_OUTPUT_COLUMNS = ['Monthly Income (£)', 'Current Savings (£)', 'Savings Goal (£)', 'Shortfall (£)',
+                        'Monthly Contribution (£)', 'Weekly Contribution (£)', 'Daily Contribution (£)']
+
+
+def employee_inputs(data):
+    # Each employee's first row, reduced to the columns a scenario is simulated from
+    columns = [EMPLOYEE_COLUMN, INCOME_COLUMN, SAVINGS_COLUMN] + [column for column in CUT_COLUMNS if column in data.columns]
+    return data.groupby(EMPLOYEE_COLUMN, sort=False, observed=True).head(1)[columns].reset_index(drop=True)
+
+
+def simulate(data, goals, current_savings=None):
+    # Goal status, shortfall, contributions and ranked cut suggestions for every employee and
+    # every goal at once; array results are shaped (employees, goals). data can be the full
+    # dataset or its employee_inputs().
+    goals = np.atleast_1d(np.asarray(goals, dtype=np.float64))
+    first_rows = employee_inputs(data)
+    if current_savings is None:
+        current_savings = first_rows[SAVINGS_COLUMN].to_numpy(dtype=np.float64)
+    current_savings = np.broadcast_to(np.asarray(current_savings, dtype=np.float64), (len(first_rows),))
+
+    shortfall = np.maximum(goals[None, :] - current_savings[:, None], 0.0)
+    monthly = shortfall / 12
+
+    cut_names = np.array([column for column in CUT_COLUMNS if column in first_rows.columns])
+    cuts = np.nan_to_num(first_rows[list(cut_names)].to_numpy(dtype=np.float64))
+    order = np.argsort(-cuts, axis=1, kind='stable')
+    ranked_cuts = np.take_along_axis(cuts, order, axis=1)
+    # Fewest cuts (largest first) whose monthly total covers the extra monthly saving needed
+    covered = np.cumsum(ranked_cuts, axis=1)[:, None, :] >= monthly[:, :, None]
+    if covered.shape[2]:
+        cuts_needed = np.where(covered.any(axis=2), covered.argmax(axis=2) + 1, -1)
+    else:
+        cuts_needed = np.full(shortfall.shape, -1)
+    cuts_needed[shortfall == 0] = 0
+
+    return {
+        'employees': first_rows[EMPLOYEE_COLUMN].to_numpy(),
+        'income': first_rows[INCOME_COLUMN].to_numpy(dtype=np.float64),
+        'goals': goals,
+        'current_savings': current_savings,
+        'met': shortfall == 0,
+        'shortfall': shortfall,
+        'monthly': monthly,
+        'weekly': shortfall / 52,
+        'daily': shortfall / 365,
+        'ranked_cut_names': cut_names[order],
+        'ranked_cuts': ranked_cuts,
+        'cuts_needed': cuts_needed,
+    }
+
+
+def suggestions_text(scenario):
+    # One string per employee, e.g. "Monthly Outing (£60.00), Netflix (£10.99)"
+    names, values = scenario['ranked_cut_names'], scenario['ranked_cuts']
+    return np.array([
+        ', '.join(f"{name[:-4]} (£{value:.2f})" for name, value in zip(row_names, row_values) if value > 0)
+        for row_names, row_values in zip(names, values)
+    ])
+
+
+def to_frame(scenario):
+    # Long table with one row per employee and goal, for display and batch export
+    n_employees, n_goals = scenario['shortfall'].shape
+    frame = pd.DataFrame({
+        'Employee': np.repeat(scenario['employees'], n_goals),
+        'Monthly Income (£)': np.repeat(scenario['income'], n_goals),
+        'Current Savings (£)': np.repeat(scenario['current_savings'], n_goals),
+        'Savings Goal (£)': np.tile(scenario['goals'], n_employees),
+        'Goal Status': np.where(scenario['met'].ravel(), 'Met', 'Not Met'),
+        'Shortfall (£)': scenario['shortfall'].ravel(),
+        'Monthly Contribution (£)': scenario['monthly'].ravel(),
+        'Weekly Contribution (£)': scenario['weekly'].ravel(),
+        'Daily Contribution (£)': scenario['daily'].ravel(),
+        'Cuts Needed': scenario['cuts_needed'].ravel(),
+        'Suggested Cuts': np.repeat(suggestions_text(scenario), n_goals),
+    })
+    # Amounts come from float32 columns, so they are rounded to pence for display and export
+    frame[MONEY_OUTPUT_COLUMNS] = frame[MONEY_OUTPUT_COLUMNS].round(2)
+    # -1 (no combination of cuts is enough) becomes a missing value in an integer column
+    frame['Cuts Needed'] = frame['Cuts Needed'].astype('Int64').where(frame['Cuts Needed'] >= 0)
+    return frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run savings goals against every employee and export the results.")
+    parser.add_argument('input', help="Employee finance CSV file")
+    parser.add_argument('-g', '--goal', type=float, action='append', help="Savings goal in £; repeat for a grid")
+    parser.add_argument('--goal-range', type=float, nargs=3, metavar=('START', 'STOP', 'STEP'),
+                        help="Grid of goals from START up to (excluding) STOP")
+    parser.add_argument('-o', '--output', default='savings_scenarios.csv')
+    args = parser.parse_args(argv)
+
+    goals = list(args.goal or [])
+    if args.goal_range:
+        goals.extend(np.arange(*args.goal_range).tolist())
+    if not goals:
+        parser.error("Give at least one --goal or a --goal-range")
+
+    data, _ = read_finance_csv(args.input)
+    results = to_frame(simulate(data, goals))
+    results.to_csv(args.output, index=False)
+    print(f"Wrote {len(results)} scenario rows for {results['Employee'].nunique()} employees to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
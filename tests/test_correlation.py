@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation import CoMoments, correlation_matrix
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(500, 4)), columns=list('abcd'))
+    frame['b'] += frame['a']
+    # Rounding gives ties for the rank-based methods
+    frame['c'] = (frame['c'] + frame['b']).round()
+    for column in 'abc':
+        frame.loc[rng.random(len(frame)) < 0.2, column] = np.nan
+    return frame
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman', 'kendall'])
+def test_matches_pandas_with_missing_values(frame, method):
+    expected = frame.corr(method=method)
+    result = correlation_matrix(frame, columns=list(frame.columns), method=method)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), atol=1e-12)
+
+
+def test_chunked_updates_match_one_pass(frame):
+    values = frame.to_numpy()
+    moments = CoMoments(values.shape[1])
+    for start in range(0, len(values), 128):
+        moments.update(values[start:start + 128])
+    np.testing.assert_allclose(moments.correlation(), frame.corr().to_numpy(), atol=1e-12)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        correlation_matrix(pd.DataFrame({'a': [1.0, 2.0]}), columns=['a'], method='cosine')
@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+import forecast_jobs
+import forecasting
+from forecasting import FitCancelled, build_history
+from model_cache import ModelCache
+
+
+@pytest.fixture
+def slow_models(monkeypatch):
+    # A stand-in LSTM that trains for a while and honours should_stop between epochs
+    release = threading.Event()
+
+    def fit(df, steps=6, should_stop=None):
+        while not release.wait(0.01):
+            if should_stop is not None and should_stop():
+                raise FitCancelled()
+        return None, [float(df['savings'].iloc[-1])] * steps
+
+    models = {'LSTM': (fit, {'steps': 6})}
+    monkeypatch.setattr(forecasting, 'MODELS', models)
+    monkeypatch.setattr(forecast_jobs, 'MODELS', models)
+    cache = ModelCache()
+    monkeypatch.setattr(forecasting, 'get_model_cache', lambda: cache)
+    yield release
+    release.set()
+
+
+def test_identical_inputs_return_the_same_job(slow_models):
+    manager = forecast_jobs.ForecastJobManager(max_workers=1)
+    first = manager.submit('session', build_history(200.0, 800.0, [(210.0, 790.0)] * 5))
+    time.sleep(0.05)
+    # A rerun rebuilds the history from the same inputs
+    second = manager.submit('session', build_history(200.0, 800.0, [(210.0, 790.0)] * 5))
+
+    assert second is first
+    assert first.status('LSTM') == 'running'
+    slow_models.set()
+    first.futures['LSTM'].result(timeout=5)
+    assert first.status('LSTM') == 'done'
+
+
+def test_changed_inputs_cancel_the_running_fit(slow_models):
+    manager = forecast_jobs.ForecastJobManager(max_workers=1)
+    first = manager.submit('session', build_history(200.0, 800.0, [(210.0, 790.0)] * 5))
+    time.sleep(0.05)
+    second = manager.submit('session', build_history(200.0, 800.0, [(250.0, 790.0)] * 5))
+
+    assert second is not first
+    # The superseded fit stops at its next check and frees the only worker
+    first.futures['LSTM'].exception(timeout=5)
+    assert first.status('LSTM') == 'cancelled'
+    assert second.status('LSTM') == 'running'
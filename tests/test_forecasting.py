@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from forecasting import build_histories, build_history, make_windows
+
+
+def _history_loop(current_savings, current_expenses, changes, base_months=5):
+    # The row-by-row construction the forecasting page used before build_histories()
+    savings = [current_savings] * base_months
+    expenses = [current_expenses] * base_months
+    for savings_change, expenses_change in changes:
+        savings.append(savings[-1] + savings_change - current_savings)
+        expenses.append(expenses[-1] + expenses_change - current_expenses)
+    return np.column_stack([savings, expenses])
+
+
+def test_build_histories_matches_loop():
+    rng = np.random.default_rng(0)
+    current = rng.uniform(100, 1000, size=(3, 2))
+    changes = current[:, None] + rng.normal(scale=50, size=(3, 5, 2))
+
+    histories = build_histories(current[:, 0], current[:, 1], changes)
+
+    assert histories.shape == (3, 10, 2)
+    for employee in range(3):
+        expected = _history_loop(*current[employee], changes[employee].tolist())
+        np.testing.assert_allclose(histories[employee], expected)
+
+
+def test_build_history_has_monthly_index():
+    history = build_history(200.0, 800.0, [(210.0, 790.0)] * 5)
+    assert list(history.columns) == ['savings', 'expenses']
+    assert len(history) == 10
+    assert (history.index.to_series().diff().dropna() >= pd.Timedelta(days=28)).all()
+    assert history.index.is_month_end.all()
+    assert (history.index == history.index.normalize()).all()
+    # Rebuilding it later the same day gives the same index
+    assert history.index.equals(build_history(200.0, 800.0, [(210.0, 790.0)] * 5).index)
+
+
+def test_make_windows_matches_loop():
+    scaled = np.random.default_rng(0).random((2, 10, 2))
+    window = 6
+
+    X, y = make_windows(scaled, window)
+
+    for employee in range(2):
+        # The page's original windowing loop
+        expected_X = [scaled[employee, i:i + window] for i in range(scaled.shape[1] - window)]
+        expected_y = [scaled[employee, i + window] for i in range(scaled.shape[1] - window)]
+        np.testing.assert_array_equal(X[employee], expected_X)
+        np.testing.assert_array_equal(y[employee], expected_y)
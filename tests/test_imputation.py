@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from imputation import Imputer
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'Employee': ['a', 'a', 'b', 'b', 'c', 'c'],
+        'Water Bill (£)': [10.0, np.nan, 30.0, 20.0, np.nan, 40.0],
+        'Monthly Outing (£)': [np.nan, 5.0, 15.0, np.nan, 25.0, 35.0],
+        'Sky Sports (£)': [np.nan, 20.0, 20.0, np.nan, 20.0, 20.0],
+        'Other Expenses (£)': [1.0, np.nan, 2.0, 3.0, np.nan, 4.0],
+        'Savings for Property (£)': [100.0, 200.0, np.nan, 300.0, 400.0, np.nan],
+    })
+
+
+def _fill_columns(frame):
+    # The fills FIllColumns.py applied to a whole file at once
+    filled = frame.copy()
+    for column in ['Water Bill (£)', 'Monthly Outing (£)']:
+        filled[column] = filled[column].fillna(frame[column].mean())
+    for column in ['Sky Sports (£)', 'Other Expenses (£)', 'Savings for Property (£)']:
+        filled[column] = filled[column].fillna(0)
+    return filled
+
+
+def test_default_strategies_match_fill_columns(frame):
+    pd.testing.assert_frame_equal(Imputer().fit_transform(frame), _fill_columns(frame))
+
+
+def test_batches_match_one_pass(frame):
+    imputer = Imputer()
+    for start in range(0, len(frame), 2):
+        imputer.partial_fit(frame.iloc[start:start + 2])
+    pd.testing.assert_frame_equal(imputer.transform(frame), _fill_columns(frame))
+
+
+def test_state_round_trip(frame, tmp_path):
+    imputer = Imputer({'Water Bill (£)': 'employee_median', 'Sky Sports (£)': 'zero'}).partial_fit(frame)
+    path = tmp_path / 'stats.json'
+    imputer.save(path)
+    pd.testing.assert_frame_equal(Imputer.load(path).transform(frame), imputer.transform(frame))
+
+
+def test_employee_median_falls_back_to_mean(frame):
+    filled = Imputer({'Water Bill (£)': 'employee_median'}).fit_transform(frame)
+    # a has its own observed value; c's only other value is 40
+    assert filled['Water Bill (£)'].tolist() == [10.0, 10.0, 30.0, 20.0, 40.0, 40.0]
+    frame.loc[frame['Employee'] == 'c', 'Water Bill (£)'] = np.nan
+    filled = Imputer({'Water Bill (£)': 'employee_median'}).fit_transform(frame)
+    assert filled['Water Bill (£)'].iloc[4] == pytest.approx(20.0)
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        Imputer({'Water Bill (£)': 'median'})
+
+
+def test_employee_median_keeps_recent_values():
+    from imputation import MAX_EMPLOYEE_VALUES
+
+    values = np.arange(MAX_EMPLOYEE_VALUES + 30, dtype=float)
+    frame = pd.DataFrame({'Employee': 'a', 'Water Bill (£)': values})
+    imputer = Imputer({'Water Bill (£)': 'employee_median'}).partial_fit(frame)
+    kept = imputer.employee_values['Water Bill (£)']['a']
+    assert kept == values[-MAX_EMPLOYEE_VALUES:].tolist()
@@ -0,0 +1,50 @@
+import io
+
+import numpy as np
+import pytest
+
+from ingestion import read_finance_csv
+
+CSV = """Employee,Monthly Income (£),Gas Bill (£),Sky Sports (£),Savings for Property (£)
+Employee 1,2500.50,45.10,,300
+Employee 1,2500.50,n/a?,20,300
+Employee 2,,40.00,20,150
+Employee 2,3100,38.25,20,
+"""
+
+
+def test_malformed_amounts_become_missing():
+    data, report = read_finance_csv(io.StringIO(CSV), chunksize=2)
+
+    assert report.chunks == 2
+    assert report.coerced_cells == 1
+    # No income: the row can't be attributed
+    assert report.dropped_rows == 1
+    assert len(data) == report.rows == 3
+    assert data['Gas Bill (£)'].dtype == np.float32
+    assert str(data['Employee'].dtype) == 'category'
+    # Zero-filled columns have no gaps left
+    assert data['Sky Sports (£)'].tolist() == [0.0, 20.0, 20.0]
+    assert data['Savings for Property (£)'].tolist() == [300.0, 300.0, 0.0]
+    assert np.isnan(data['Gas Bill (£)'].iloc[1])
+
+
+def test_missing_required_column():
+    with pytest.raises(ValueError, match='Monthly Income'):
+        read_finance_csv(io.StringIO("Employee,Savings for Property (£)\nEmployee 1,10\n"))
+
+
+def test_parquet_goes_through_the_same_cleaning(tmp_path):
+    pytest.importorskip('pyarrow')
+    import pandas as pd
+
+    from ingestion import read_finance_parquet
+
+    expected, _ = read_finance_csv(io.StringIO(CSV))
+    raw = pd.read_csv(io.StringIO(CSV))
+    raw.to_parquet(tmp_path / 'data.parquet')
+
+    data, report = read_finance_parquet(tmp_path / 'data.parquet', chunksize=2)
+
+    assert report.dropped_rows == 1
+    pd.testing.assert_frame_equal(data, expected)
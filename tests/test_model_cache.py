@@ -0,0 +1,45 @@
+import os
+
+import pandas as pd
+
+from forecasting import build_history, history_key
+from model_cache import ModelCache
+
+
+def test_same_inputs_give_same_key():
+    changes = [(210.0, 790.0)] * 5
+    first = build_history(200.0, 800.0, changes)
+    second = build_history(200.0, 800.0, changes)
+    assert history_key(first, model='LSTM') == history_key(second, model='LSTM')
+
+    # Built later the same month, e.g. on a rerun an hour later
+    later = first.copy()
+    later.index = first.index + pd.Timedelta(hours=1)
+    assert history_key(later, model='LSTM') == history_key(first, model='LSTM')
+
+
+def test_key_changes_with_values_and_params():
+    history = build_history(200.0, 800.0, [(210.0, 790.0)] * 5)
+    edited = build_history(200.0, 800.0, [(220.0, 790.0)] * 5)
+    assert history_key(edited, model='LSTM') != history_key(history, model='LSTM')
+    assert history_key(history, model='ARIMA') != history_key(history, model='LSTM')
+
+
+def test_memory_lru():
+    cache = ModelCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    cache = ModelCache(max_entries=1, cache_dir=str(tmp_path), max_disk_entries=3)
+    for i in range(5):
+        cache.put(f"key{i}", i)
+        # Distinct mtimes so eviction order is deterministic
+        os.utime(tmp_path / f"key{i}.pkl", (i, i))
+    assert sorted(os.listdir(tmp_path)) == ['key2.pkl', 'key3.pkl', 'key4.pkl']
+    assert cache.get_or_compute('key0', lambda: 'recomputed') == 'recomputed'
+    assert ModelCache(cache_dir=str(tmp_path)).get('key4') == 4
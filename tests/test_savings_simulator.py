@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from savings_simulator import simulate, to_frame
+
+
+def _data():
+    return pd.DataFrame({
+        'Employee': pd.Categorical(['a', 'a', 'b', 'c']),
+        'Monthly Income (£)': np.array([3429.52, 3429.52, 2000.0, 1500.0], dtype=np.float32),
+        'Savings for Property (£)': np.array([566.87, 100.0, 1200.0, 0.0], dtype=np.float32),
+        'Sky Sports (£)': np.array([30.0, 30.0, 0.0, 0.0], dtype=np.float32),
+        'Netflix (£)': np.array([10.99, 10.99, 5.0, 0.0], dtype=np.float32),
+        'Monthly Outing (£)': np.array([60.0, 60.0, 20.0, 0.0], dtype=np.float32),
+    })
+
+
+def test_simulate_matches_per_employee_loop():
+    data = _data()
+    goals = [1000.0, 1500.0]
+    scenario = simulate(data, goals)
+
+    assert scenario['employees'].tolist() == ['a', 'b', 'c']
+    for i, savings in enumerate([566.87, 1200.0, 0.0]):
+        for j, goal in enumerate(goals):
+            shortfall = max(goal - savings, 0.0)
+            assert scenario['met'][i, j] == (shortfall == 0)
+            np.testing.assert_allclose(scenario['monthly'][i, j], shortfall / 12, rtol=1e-6)
+    # a needs 36.09/month for 1000 (Monthly Outing alone) and 77.76 for 1500 (plus Sky Sports)
+    assert scenario['cuts_needed'][0].tolist() == [1, 2]
+    assert scenario['cuts_needed'][1, 0] == 0
+    # c has nothing to cut
+    assert scenario['cuts_needed'][2, 0] == -1
+
+
+def test_to_frame_export_types():
+    frame = to_frame(simulate(_data(), [1000.0]))
+
+    assert frame['Monthly Income (£)'].tolist() == [3429.52, 2000.0, 1500.0]
+    assert frame['Current Savings (£)'].tolist() == [566.87, 1200.0, 0.0]
+    assert str(frame['Cuts Needed'].dtype) == 'Int64'
+    assert frame['Cuts Needed'].tolist()[:2] == [1, 0]
+    assert frame['Cuts Needed'].isna().tolist() == [False, False, True]
+    assert '3429.52,' in frame.to_csv(index=False)
+
+
+def test_employee_inputs_give_the_same_scenarios():
+    from savings_simulator import employee_inputs
+
+    data = _data()
+    inputs = employee_inputs(data)
+    assert len(inputs) == 3
+    pd.testing.assert_frame_equal(to_frame(simulate(inputs, [1000.0, 1500.0])),
+                                  to_frame(simulate(data, [1000.0, 1500.0])))
@@ -0,0 +1,32 @@
+import numpy as np
+
+from trend import fit_line, fit_lines
+
+
+def test_fit_lines_matches_polyfit_per_group():
+    rng = np.random.default_rng(0)
+    groups = np.repeat(['x', 'y', 'z'], [4, 7, 12])
+    t = np.concatenate([np.arange(4), np.arange(7), np.arange(12)])
+    y = rng.normal(size=(len(t), 2)) + t[:, None] * [1.5, -0.5]
+
+    index, slope, intercept, n = fit_lines(t, y, groups)
+
+    assert list(index) == ['x', 'y', 'z']
+    assert n.tolist() == [4, 7, 12]
+    for row, group in enumerate(index):
+        for column in range(y.shape[1]):
+            rows = groups == group
+            expected_slope, expected_intercept = np.polyfit(t[rows], y[rows, column], 1)
+            np.testing.assert_allclose([slope[row, column], intercept[row, column]],
+                                       [expected_slope, expected_intercept], atol=1e-9)
+
+
+def test_single_observation_is_flat():
+    _, slope, intercept, _ = fit_lines([0], [[3.0]], ['only'])
+    assert slope[0, 0] == 0.0
+    assert intercept[0, 0] == 3.0
+
+
+def test_fit_line():
+    y = [2.0, 4.5, 5.0, 8.0, 9.5]
+    np.testing.assert_allclose(fit_line(y), np.polyfit(np.arange(len(y)), y, 1))
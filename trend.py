@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from ingestion import EMPLOYEE_COLUMN, EXPENSE_COLUMNS
+from model_cache import ModelCache
+from profiling import profiled
+from results_store import load_results
+
+_cache = ModelCache(max_entries=16)
+
+
+def fit_lines(t, y, groups):
+    # Closed-form least squares y = intercept + slope * t for every group and every column of y
+    # in one grouped pass: slope = (n*Sty - St*Sy) / (n*Stt - St^2), intercept = (Sy - slope*St) / n
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64).reshape(len(t), -1)
+    sums = pd.DataFrame(np.column_stack([np.ones_like(t), t, t * t, y, t[:, None] * y])).groupby(groups, sort=False).sum()
+    n_columns = y.shape[1]
+    n, s_t, s_tt = (sums[i].to_numpy()[:, None] for i in range(3))
+    s_y = sums.iloc[:, 3:3 + n_columns].to_numpy()
+    s_ty = sums.iloc[:, 3 + n_columns:].to_numpy()
+    denominator = n * s_tt - s_t ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # A single observation has no trend; it is carried forward flat
+        slope = np.where(denominator > 0, (n * s_ty - s_t * s_y) / denominator, 0.0)
+    intercept = (s_y - slope * s_t) / n
+    return sums.index, slope, intercept, n[:, 0].astype(int)
+
+
+def fit_line(y):
+    # Single series against its month number 0..len(y)-1
+    _, slope, intercept, _ = fit_lines(np.arange(len(y)), y, np.zeros(len(y), dtype=int))
+    return slope[0, 0], intercept[0, 0]
+
+
+@profiled('trend_fit')
+def fit_trends(data, columns=EXPENSE_COLUMNS):
+    # Each employee's rows are consecutive months in file order, numbered from 0
+    columns = [column for column in columns if column in data.columns]
+    months = data.groupby(EMPLOYEE_COLUMN, sort=False, observed=True).cumcount().to_numpy()
+    employees, slope, intercept, n = fit_lines(months, data[columns].to_numpy(),
+                                               data[EMPLOYEE_COLUMN].to_numpy())
+    index = pd.Index(employees, name=EMPLOYEE_COLUMN)
+    return {
+        'slope': pd.DataFrame(slope, index=index, columns=columns),
+        'intercept': pd.DataFrame(intercept, index=index, columns=columns),
+        'months': pd.Series(n, index=index),
+    }
+
+
+def forecast(trends, column, employees, future_months):
+    # (employees x future_months) predictions continuing after each employee's last month
+    slope = trends['slope'].loc[employees, column].to_numpy()[:, None]
+    intercept = trends['intercept'].loc[employees, column].to_numpy()[:, None]
+    t = trends['months'].loc[employees].to_numpy()[:, None] + np.arange(future_months)[None, :]
+    return pd.DataFrame(intercept + slope * t, index=pd.Index(employees, name=EMPLOYEE_COLUMN),
+                        columns=[f"Month {i}" for i in range(1, future_months + 1)])
+
+
+def trends_to_frames(trends):
+    return {'trend_slope': trends['slope'], 'trend_intercept': trends['intercept'],
+            'trend_months': trends['months'].to_frame('Months')}
+
+
+def cached_trends(data, dataset_key):
+    def compute():
+        frames = load_results(dataset_key, 'eda')
+        if frames is not None:
+            return {'slope': frames['trend_slope'], 'intercept': frames['trend_intercept'],
+                    'months': frames['trend_months']['Months']}
+        return fit_trends(data)
+
+    return _cache.get_or_compute(f"{dataset_key}:trends", compute)